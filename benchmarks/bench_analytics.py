@@ -0,0 +1,46 @@
+"""Mide el tiempo de las analíticas de ocupación sobre un año académico de reservas.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_analytics
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from modules.salas import Reserva
+from modules.analytics import calcular_ocupacion, horas_pico, mapa_calor, salas_ociosas, utilizacion_por_sala
+
+SALAS = 100
+DIAS = 300  # días hábiles de un año académico aproximado
+REPETICIONES = 5
+
+def generar(semilla=42):
+    """Bloques de 90 minutos entre las 8 y las 20 en cada sala, con 60% de ocupación"""
+    rng = random.Random(semilla)
+    base = datetime(2024, 3, 1)
+    reservas = []
+    for dia in range(DIAS):
+        for sala_id in range(1, SALAS + 1):
+            for hora in range(8, 20, 2):
+                if rng.random() < 0.6:
+                    inicio = base + timedelta(days=dia, hours=hora, minutes=rng.choice([0, 15, 30]))
+                    reservas.append(Reserva(len(reservas) + 1, sala_id, f"docente{rng.randint(1, 500)}@test.com",
+                                            inicio, inicio + timedelta(minutes=90),
+                                            'cancelada' if rng.random() < 0.05 else 'activa'))
+    return reservas, base, base + timedelta(days=DIAS)
+
+def main():
+    reservas, desde, hasta = generar()
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        ocupacion = calcular_ocupacion(reservas, range(1, SALAS + 1), desde, hasta)
+        utilizacion_por_sala(ocupacion, (8, 22))
+        mapa_calor(ocupacion)
+        horas_pico(ocupacion)
+        salas_ociosas(ocupacion, 5.0)
+        tiempos.append(time.perf_counter() - inicio)
+    print(f"{len(reservas)} reservas, {SALAS} salas, {ocupacion.minutos.shape[1]} franjas")
+    print(f"mejor: {min(tiempos) * 1000:.1f} ms  mediana: {sorted(tiempos)[len(tiempos) // 2] * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""Mide la latencia de buscar_salas_disponibles y sugerir_horarios según el número de reservas.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_busqueda
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from modules.salas import GestorSalas
+
+TAMANOS = [1_000, 10_000, 100_000, 1_000_000]
+CONSULTAS = 2_000
+
+def poblar(gestor, cantidad, semilla=42):
+    """Crea `cantidad` reservas de una hora repartidas entre las salas"""
+    rng = random.Random(semilla)
+    base = datetime(2024, 3, 1, 8, 0)
+    salas = [s.id for s in gestor.salas]
+    for i in range(cantidad):
+        inicio = base + timedelta(hours=i // len(salas))
+        gestor.crear_reserva(salas[i % len(salas)], f"docente{rng.randint(1, 500)}@test.com",
+                             inicio, inicio + timedelta(hours=1))
+    return base, base + timedelta(hours=cantidad // len(salas))
+
+def medir(consulta, desde, hasta, semilla=7):
+    rng = random.Random(semilla)
+    rango = int((hasta - desde).total_seconds() // 60)
+    inicio_total = time.perf_counter()
+    for _ in range(CONSULTAS):
+        inicio = desde + timedelta(minutes=rng.randrange(rango))
+        consulta(inicio, inicio + timedelta(minutes=90))
+    return (time.perf_counter() - inicio_total) / CONSULTAS
+
+def main():
+    print(f"{'reservas':>10} {'µs/búsqueda':>12} {'µs/sugerencia':>14}")
+    for tamano in TAMANOS:
+        gestor = GestorSalas()
+        desde, hasta = poblar(gestor, tamano)
+        busqueda = medir(lambda inicio, fin: gestor.buscar_salas_disponibles(inicio, fin, capacidad_min=20),
+                         desde, hasta)
+        # Las salas están ocupadas sin pausas: se recorre todo el horizonte de 7 días
+        sugerencia = medir(lambda inicio, fin: gestor.sugerir_horarios(fin - inicio, inicio, capacidad_min=20),
+                           desde, hasta)
+        print(f"{tamano:>10} {busqueda * 1e6:>12.1f} {sugerencia * 1e6:>14.1f}")
+
+if __name__ == "__main__":
+    main()
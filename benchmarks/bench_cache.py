@@ -0,0 +1,79 @@
+"""Compara lecturas repetidas de reservas con y sin la caché validada por os.stat.
+
+Mide get_reservation (un registro) y load_reservations (la colección completa,
+una copia que el llamador puede modificar) contra un json.load del archivo.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_cache
+"""
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from modules.storage import JSONStorage
+
+RESERVAS = 5_000
+LECTURAS = 200
+CARGAS = 20
+
+def poblar(storage):
+    base = datetime(2024, 3, 1, 8, 0)
+    reservations = {}
+    for i in range(RESERVAS):
+        inicio = base + timedelta(hours=i)
+        reservations[str(i + 1)] = {
+            "room_id": str(i % 20 + 1),
+            "user_id": str(i % 300 + 1),
+            "start_time": inicio.isoformat(),
+            "end_time": (inicio + timedelta(hours=1)).isoformat(),
+            "purpose": "Clase",
+            "attendees": [],
+            "status": "pending",
+            "created_at": base.isoformat()
+        }
+    storage.save("reservations", reservations)
+
+def medir(storage):
+    # Primera lectura fuera de la medición (llena la caché si está activa)
+    storage.get("reservations", "1")
+    inicio = time.perf_counter()
+    for i in range(LECTURAS):
+        storage.get("reservations", str(i % RESERVAS + 1))
+    return (time.perf_counter() - inicio) / LECTURAS
+
+def medir_carga(cargar):
+    cargar()
+    inicio = time.perf_counter()
+    for _ in range(CARGAS):
+        cargar()
+    return (time.perf_counter() - inicio) / CARGAS
+
+def json_load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    with tempfile.TemporaryDirectory() as directorio:
+        files = {name: os.path.join(directorio, f"{name}.json")
+                 for name in ("rooms", "users", "reservations")}
+        poblar(JSONStorage(files))
+        sin_cache = medir(JSONStorage(files, cache=False))
+        con_cache = medir(JSONStorage(files))
+        storage_sin_cache = JSONStorage(files, cache=False)
+        storage_con_cache = JSONStorage(files)
+        storage_con_cache.get("reservations", "1")
+        cargas = {
+            "json.load": medir_carga(lambda: json_load(files["reservations"])),
+            "sin caché": medir_carga(lambda: storage_sin_cache.load("reservations")),
+            "con caché": medir_carga(lambda: storage_con_cache.load("reservations")),
+        }
+    print(f"{RESERVAS} reservas, {LECTURAS} lecturas de get_reservation")
+    print(f"sin caché: {sin_cache * 1e6:>10.1f} µs/lectura")
+    print(f"con caché: {con_cache * 1e6:>10.1f} µs/lectura")
+    print(f"{CARGAS} lecturas de load_reservations")
+    for nombre, duracion in cargas.items():
+        print(f"{nombre:>9}: {duracion * 1e3:>10.1f} ms/carga")
+
+if __name__ == "__main__":
+    main()
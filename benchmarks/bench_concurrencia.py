@@ -0,0 +1,100 @@
+"""Reservas por segundo con 1, 4 y 16 hilos creando reservas a la vez.
+
+Cada fila parte del mismo conjunto de datos (SALAS salones con PREVIAS
+reservas ya cargadas) y crea la misma cantidad total de reservas, repartida
+entre los hilos. Cada hilo reserva bloques consecutivos en su propio salón, de
+modo que las reservas de salones distintos pueden avanzar en paralelo.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_concurrencia
+"""
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from modules.salas import GestorSalas, Sala
+from modules.storage import JSONStorage, JournalStorage, SQLiteStorage, set_storage
+from modules.reservations import create_reservation
+
+HILOS = [1, 4, 16]
+SALAS = max(HILOS)
+# Reservas creadas en cada medición (en total, no por hilo)
+RESERVAS = {"memoria": 16_000, "json": 320, "journal": 8_000, "sqlite": 3_200}
+# Reservas existentes antes de medir, en un periodo anterior
+PREVIAS = 2_000
+
+def bloques(cantidad, base=datetime(2024, 3, 4, 8, 0)):
+    for i in range(cantidad):
+        inicio = base + timedelta(hours=i)
+        yield inicio, inicio + timedelta(hours=1)
+
+def correr(hilos, trabajo):
+    barrera = threading.Barrier(hilos)
+    def tarea(numero):
+        barrera.wait()
+        trabajo(numero)
+    lista = [threading.Thread(target=tarea, args=(i,)) for i in range(hilos)]
+    inicio = time.perf_counter()
+    for hilo in lista:
+        hilo.start()
+    for hilo in lista:
+        hilo.join()
+    return time.perf_counter() - inicio
+
+def previas():
+    """(salón, inicio, fin) de las reservas existentes, repartidas entre los salones"""
+    for i, (inicio, fin) in enumerate(bloques(PREVIAS, datetime(2023, 3, 6, 8, 0))):
+        yield i % SALAS + 1, inicio, fin
+
+def medir_memoria(hilos):
+    gestor = GestorSalas(salas=[Sala(i + 1, f"Sala {i + 1}", 30, True, True, True) for i in range(SALAS)])
+    for sala_id, inicio, fin in previas():
+        gestor.crear_reserva(sala_id, "docente@test.com", inicio, fin)
+    cantidad = RESERVAS["memoria"] // hilos
+    def trabajo(numero):
+        for inicio, fin in bloques(cantidad):
+            gestor.crear_reserva(numero + 1, "docente@test.com", inicio, fin)
+    return hilos * cantidad / correr(hilos, trabajo)
+
+def medir_storage(nombre, storage, hilos):
+    set_storage(storage)
+    storage.save("rooms", {str(i + 1): {"name": f"Sala {i + 1}", "capacity": 30} for i in range(SALAS)})
+    storage.save("users", {"1": {"email": "docente@test.com"}})
+    storage.save("reservations", {str(i + 1): {
+        "room_id": str(sala_id),
+        "user_id": "1",
+        "start_time": inicio.isoformat(),
+        "end_time": fin.isoformat(),
+        "purpose": "Clase",
+        "attendees": [],
+        "status": "pending",
+        "checked_in_at": None,
+        "created_at": inicio.isoformat()
+    } for i, (sala_id, inicio, fin) in enumerate(previas())})
+    cantidad = RESERVAS[nombre] // hilos
+    def trabajo(numero):
+        for inicio, fin in bloques(cantidad):
+            create_reservation(str(numero + 1), "1", inicio.isoformat(), fin.isoformat(), "Clase")
+    return hilos * cantidad / correr(hilos, trabajo)
+
+def main():
+    print(f"{'backend':>8} " + " ".join(f"{h:>3} hilos" for h in HILOS) + "   (reservas/s)")
+    print(f"{'memoria':>8} " + " ".join(f"{medir_memoria(h):>9.0f}" for h in HILOS))
+    for nombre in ("json", "journal", "sqlite"):
+        resultados = []
+        for hilos in HILOS:
+            with tempfile.TemporaryDirectory() as directorio:
+                files = {name: os.path.join(directorio, f"{name}.json")
+                         for name in ("rooms", "users", "reservations")}
+                if nombre == "json":
+                    storage = JSONStorage(files)
+                elif nombre == "journal":
+                    storage = JournalStorage(files, fsync=False)
+                else:
+                    storage = SQLiteStorage(os.path.join(directorio, "salas.db"))
+                resultados.append(medir_storage(nombre, storage, hilos))
+        print(f"{nombre:>8} " + " ".join(f"{r:>9.0f}" for r in resultados))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Bytes enviados a los clientes y CPU del servidor al propagar cambios de reservas a muchas sesiones.
+
+Abre SESIONES páginas de Flet reales sobre una conexión que procesa los
+comandos como el servidor de Flet pero, en lugar de mandarlos por el
+websocket, solo cuenta sus bytes. Todas las sesiones inician como
+administrador y abren "Gestionar Reservas". Después se cancelan CAMBIOS
+reservas visibles y se compara:
+  - reconstrucción: cada sesión vuelve a abrir la vista completa, que era la
+    única forma de ver el cambio antes del bus de eventos;
+  - bus: cada sesión recibe el evento y envía solo los controles afectados.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_eventos
+"""
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+import flet as ft
+from flet.core.local_connection import LocalConnection
+from flet.core.protocol import (
+    ClientActions, ClientMessage, CommandEncoder,
+    PageCommandResponsePayload, PageCommandsBatchResponsePayload
+)
+import main
+from modules.salas import obtener_gestor_salas
+
+SESIONES = 200
+RESERVAS = 400
+CAMBIOS = 10
+
+class ConexionContada(LocalConnection):
+    """Conexión sin cliente: procesa los comandos como el servidor de Flet y cuenta lo que enviaría"""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.mensajes = 0
+
+    def _enviar(self, mensaje: ClientMessage):
+        datos = json.dumps(mensaje, cls=CommandEncoder, separators=(",", ":")).encode()
+        with self._lock:
+            self.bytes += len(datos)
+            self.mensajes += 1
+
+    def send_command(self, session_id, command):
+        resultado, mensaje = self._process_command(command)
+        if mensaje:
+            self._enviar(mensaje)
+        return PageCommandResponsePayload(result=resultado, error="")
+
+    def send_commands(self, session_id, commands):
+        resultados = []
+        mensajes = []
+        for command in commands:
+            resultado, mensaje = self._process_command(command)
+            if command.name in ("add", "get"):
+                resultados.append(resultado)
+            if mensaje:
+                mensajes.append(mensaje)
+        if mensajes:
+            self._enviar(ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, mensajes))
+        return PageCommandsBatchResponsePayload(results=resultados, error="")
+
+def recorrer(control):
+    yield control
+    hijos = getattr(control, "controls", None)
+    if isinstance(hijos, list):
+        for hijo in hijos:
+            yield from recorrer(hijo)
+    contenido = getattr(control, "content", None)
+    if isinstance(contenido, ft.Control):
+        yield from recorrer(contenido)
+
+def boton(page, texto):
+    """Primer control con on_click cuyo texto (o el de algún hijo) es `texto`"""
+    for control in recorrer(page):
+        if getattr(control, "on_click", None) and any(
+                getattr(c, "text", None) == texto or getattr(c, "value", None) == texto
+                for c in recorrer(control)):
+            return control
+    return None
+
+def abrir_sesiones(conexion, loop):
+    """Crea las páginas, inicia sesión como administrador y abre la gestión de reservas"""
+    paginas = []
+    for numero in range(SESIONES):
+        page = ft.Page(conexion, f"sesion-{numero}", loop)
+        main.main(page)
+        campos = [c for c in recorrer(page) if isinstance(c, ft.TextField)]
+        campos[0].value, campos[1].value = "admin@test.com", "123456"
+        boton(page, "Iniciar sesión").on_click(None)
+        paginas.append(page)
+    # El inicio de sesión corre en el ejecutor de tareas
+    limite = time.monotonic() + 30
+    while any(boton(page, "Gestionar Reservas") is None for page in paginas):
+        if time.monotonic() > limite:
+            raise RuntimeError("Las sesiones no terminaron de iniciar")
+        time.sleep(0.05)
+    for page in paginas:
+        boton(page, "Gestionar Reservas").on_click(None)
+    return paginas
+
+def medir(conexion, accion):
+    """Bytes, mensajes y segundos de CPU del proceso que consume `accion`"""
+    bytes_antes, mensajes_antes = conexion.bytes, conexion.mensajes
+    cpu = time.process_time()
+    accion()
+    return conexion.bytes - bytes_antes, conexion.mensajes - mensajes_antes, time.process_time() - cpu
+
+def main_bench():
+    gestor = obtener_gestor_salas()
+    base = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=7)
+    reservas = [gestor.crear_reserva(gestor.salas[i % len(gestor.salas)].id, f"docente{i}@test.com",
+                                     base + timedelta(hours=i // len(gestor.salas)),
+                                     base + timedelta(hours=i // len(gestor.salas) + 1))
+                for i in range(RESERVAS)]
+    conexion = ConexionContada()
+    loop = asyncio.new_event_loop()
+    paginas = abrir_sesiones(conexion, loop)
+    bus = gestor.eventos
+
+    # Antes: el cambio no se propaga y cada sesión reconstruye la vista para verlo
+    gestor.eventos = None
+    total_reconstruccion = [0, 0, 0.0]
+    for reserva in reservas[:CAMBIOS]:
+        gestor.cancelar_reserva(reserva.id)
+        for page in paginas:
+            boton(page, "Volver").on_click(None)
+            enviados = medir(conexion, lambda: boton(page, "Gestionar Reservas").on_click(None))
+            total_reconstruccion = [a + b for a, b in zip(total_reconstruccion, enviados)]
+
+    # Después: un evento por cambio y cada sesión envía solo la tarjeta afectada
+    gestor.eventos = bus
+    total_bus = [0, 0, 0.0]
+    for reserva in reservas[CAMBIOS:2 * CAMBIOS]:
+        enviados = medir(conexion, lambda: gestor.cancelar_reserva(reserva.id))
+        total_bus = [a + b for a, b in zip(total_bus, enviados)]
+
+    print(f"{SESIONES} sesiones en Gestionar Reservas, {RESERVAS} reservas, {CAMBIOS} cancelaciones")
+    print(f"{'estrategia':>15} {'KB/cambio':>12} {'msj/cambio':>12} {'CPU ms/cambio':>14}")
+    for nombre, (enviados, mensajes, cpu) in (("reconstrucción", total_reconstruccion), ("bus", total_bus)):
+        print(f"{nombre:>15} {enviados / CAMBIOS / 1024:>12.1f} {mensajes / CAMBIOS:>12.0f} "
+              f"{cpu / CAMBIOS * 1000:>14.1f}")
+
+if __name__ == "__main__":
+    main_bench()
\ No newline at end of file
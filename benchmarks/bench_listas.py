@@ -0,0 +1,60 @@
+"""Compara la lista de reservas completa con la lista paginada de la interfaz.
+
+Construye las tarjetas de "Gestión de Reservas" para N reservas y mide el tiempo
+de armado y el tamaño del mensaje que Flet enviaría al cliente al agregarlas.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_listas
+"""
+import json
+import time
+from datetime import datetime, timedelta
+import flet as ft
+from flet import Column, Row, Text
+from flet.core.protocol import CommandEncoder
+from modules.salas import GestorSalas
+from modules.styles import card, paged_list_view, primary_button, subtitle
+
+RESERVAS = 10_000
+
+def tarjeta_reserva(gestor, reserva):
+    """Misma tarjeta que arma show_gestion_reservas"""
+    sala = next(s for s in gestor.salas if s.id == reserva.sala_id)
+    return card(Column([
+        subtitle(sala.nombre),
+        Text(f"Usuario: {reserva.usuario_email}"),
+        Text(f"Fecha: {reserva.fecha_inicio.strftime('%d/%m/%Y')}"),
+        Text(f"Hora: {reserva.fecha_inicio.strftime('%H:%M')} - {reserva.fecha_fin.strftime('%H:%M')}"),
+        Text(f"Estado: {reserva.estado}"),
+        Row([primary_button("Cancelar", on_click=lambda e: None)])
+    ]))
+
+def medir(construir):
+    """Tiempo de armado y serialización, y tamaño en bytes del mensaje de alta"""
+    inicio = time.perf_counter()
+    control = construir()
+    comandos = control._build_add_commands()
+    carga = json.dumps(comandos, cls=CommandEncoder)
+    return time.perf_counter() - inicio, len(comandos), len(carga.encode())
+
+def main():
+    gestor = GestorSalas()
+    base = datetime(2024, 3, 1, 8, 0)
+    for i in range(RESERVAS):
+        inicio = base + timedelta(hours=i // len(gestor.salas))
+        gestor.crear_reserva(gestor.salas[i % len(gestor.salas)].id, f"docente{i % 500}@test.com",
+                             inicio, inicio + timedelta(hours=1))
+
+    variantes = {
+        "completa": lambda: Column([tarjeta_reserva(gestor, r) for r in gestor.reservas],
+                                   scroll=ft.ScrollMode.AUTO),
+        "paginada": lambda: paged_list_view(tarjeta_reserva(gestor, r) for r in gestor.reservas),
+    }
+    print(f"{RESERVAS} reservas")
+    print(f"{'lista':>10} {'ms':>10} {'controles':>10} {'KB':>10}")
+    for nombre, construir in variantes.items():
+        segundos, controles, tamano = medir(construir)
+        print(f"{nombre:>10} {segundos * 1000:>10.1f} {controles:>10} {tamano / 1024:>10.1f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""Inicios de sesión por segundo con 50.000 usuarios registrados.
+
+Compara authenticate_user (índice de emails y last_login en lote) con la
+versión anterior, que recorría todos los usuarios y reescribía el archivo en
+cada inicio de sesión.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_logins
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from modules.storage import JSONStorage, JournalStorage, SQLiteStorage, set_storage
+from modules import users
+from modules.users import authenticate_user, flush_last_logins, hash_password
+
+USUARIOS = 50_000
+LOGINS = 2_000
+LOGINS_SIN_INDICE = 20
+
+def poblar(storage):
+    storage.insert_many("users", [{
+        "email": f"Docente{i}@Test.com",
+        "password": hash_password(f"clave{i}"),
+        "name": f"Docente {i}",
+        "role": "teacher",
+        "created_at": datetime.now().isoformat(),
+        "last_login": None
+    } for i in range(USUARIOS)])
+
+def autenticar_sin_indice(storage, email, password):
+    """authenticate_user tal como era antes: recorrido completo y escritura inmediata"""
+    for user_id, user in storage.load("users").items():
+        if user["email"].lower() == email.lower() and user["password"] == hash_password(password):
+            user["last_login"] = datetime.now().isoformat()
+            storage.put("users", user_id, user)
+            return True
+    return False
+
+def medir(autenticar, cantidad, semilla=7):
+    rng = random.Random(semilla)
+    numeros = [rng.randrange(USUARIOS) for _ in range(cantidad)]
+    inicio = time.perf_counter()
+    for n in numeros:
+        assert autenticar(f"docente{n}@test.com", f"clave{n}")
+    return cantidad / (time.perf_counter() - inicio)
+
+def main():
+    # Sin temporizador: la escritura en lote se mide aparte
+    users.LAST_LOGIN_FLUSH_INTERVAL = 3600
+    with tempfile.TemporaryDirectory() as directorio:
+        backends = {
+            "json": lambda: JSONStorage({c: os.path.join(directorio, "json", f"{c}.json")
+                                         for c in ("rooms", "users", "reservations")}),
+            "journal": lambda: JournalStorage({c: os.path.join(directorio, "journal", f"{c}.json")
+                                               for c in ("rooms", "users", "reservations")}),
+            "sqlite": lambda: SQLiteStorage(os.path.join(directorio, "salas.db")),
+        }
+        print(f"{USUARIOS} usuarios")
+        print(f"{'backend':>8} {'antes/s':>10} {'ahora/s':>10} {'escritura en lote (ms)':>24}")
+        for nombre, crear in backends.items():
+            storage = crear()
+            poblar(storage)
+            set_storage(storage)
+            antes = medir(lambda e, p: autenticar_sin_indice(storage, e, p), LOGINS_SIN_INDICE)
+            ahora = medir(lambda e, p: authenticate_user(e, p)[0], LOGINS)
+            inicio = time.perf_counter()
+            flush_last_logins()
+            lote = time.perf_counter() - inicio
+            print(f"{nombre:>8} {antes:>10.1f} {ahora:>10.0f} {lote * 1000:>24.1f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""Tiempo que los manejadores de eventos ocupan su hilo, antes y después del ejecutor de tareas.
+
+Simula una ráfaga de clics en "Reservar" atendidos por un grupo de hilos como
+el que usa Flet para los manejadores. "antes" hace la reserva y el QR dentro
+del manejador; "después" solo encola el trabajo en EjecutorTareas.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_manejadores
+"""
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from modules.qr import QRManager
+from modules.salas import GestorSalas, Sala
+from modules.storage import JSONStorage, set_storage
+from modules.rooms import create_room
+from modules.users import create_user
+from modules.reservations import create_reservation
+from modules.tareas import EjecutorTareas, MetricasBloqueo
+
+EVENTOS = 200
+HILOS_FLET = 8
+
+def bloques(cantidad):
+    base = datetime(2024, 3, 4, 8, 0)
+    for i in range(cantidad):
+        inicio = base + timedelta(hours=i)
+        yield i, inicio, inicio + timedelta(hours=1)
+
+def reservar_memoria(gestor):
+    def trabajo(i, inicio, fin):
+        reserva = gestor.crear_reserva(1, "docente@test.com", inicio, fin)
+        return QRManager.generar_qr_base64(reserva.id, 1, "docente@test.com", inicio, fin)
+    return trabajo
+
+def reservar_json(room_id, user_id):
+    def trabajo(i, inicio, fin):
+        return create_reservation(room_id, user_id, inicio.isoformat(), fin.isoformat(), "Clase")
+    return trabajo
+
+def rafaga(manejador):
+    """Atiende EVENTOS clics con HILOS_FLET hilos y devuelve las métricas del manejador"""
+    metricas = MetricasBloqueo()
+    medido = metricas.medir("reservar")(manejador)
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(HILOS_FLET) as pool:
+        for args in bloques(EVENTOS):
+            pool.submit(medido, *args)
+    return metricas.resumen()["reservar"], time.perf_counter() - inicio
+
+def comparar(nombre, crear_trabajo):
+    antes, _ = rafaga(crear_trabajo())
+    ejecutor = EjecutorTareas()
+    trabajo = crear_trabajo()
+    terminadas = threading.Semaphore(0)
+    despues, encolado = rafaga(lambda *args: ejecutor.ejecutar(lambda: trabajo(*args),
+                                                                lambda resultado: terminadas.release()))
+    for _ in range(EVENTOS):
+        terminadas.acquire()
+    ejecutor.cerrar()
+    for etapa, datos in (("antes", antes), ("después", despues)):
+        print(f"{nombre:>8} {etapa:>8} {datos['promedio_ms']:>12.3f} {datos['maximo_ms']:>12.3f}")
+
+def main():
+    print(f"{EVENTOS} clics en Reservar, {HILOS_FLET} hilos de manejadores")
+    print(f"{'caso':>8} {'':>8} {'prom. (ms)':>12} {'máx. (ms)':>12}")
+    comparar("memoria", lambda: reservar_memoria(GestorSalas()))
+    with tempfile.TemporaryDirectory() as directorio:
+        storage = JSONStorage({c: os.path.join(directorio, f"{c}.json")
+                               for c in ("rooms", "users", "reservations")})
+        set_storage(storage)
+        create_room("Sala A101", 30, "Edificio A")
+        create_user("docente@test.com", "123456", "Docente")
+        estado = {"salon": 0}
+        def nuevo_trabajo():
+            # Un salón nuevo por medición para no chocar con las reservas anteriores
+            estado["salon"] += 1
+            create_room(f"Sala {estado['salon']}", 30, "Edificio A")
+            return reservar_json(str(estado["salon"] + 1), "1")
+        comparar("json", nuevo_trabajo)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
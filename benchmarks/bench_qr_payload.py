@@ -0,0 +1,65 @@
+"""Compara el contenido JSON de los QR con el formato compacto firmado.
+
+Mide la versión de QR resultante, el tiempo de generación del PNG y, si
+pyzbar/libzbar están disponibles, el tiempo de decodificación.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_qr_payload
+"""
+import io
+import json
+import time
+from datetime import datetime
+import qrcode
+from PIL import Image
+from modules.qr_payload import encode_compact
+
+REPETICIONES = 200
+
+def contenido_json():
+    return json.dumps({
+        "reserva_id": 1234,
+        "sala_id": 12,
+        "usuario_email": "docente.ejemplo@ues.edu.sv",
+        "fecha_inicio": datetime(2024, 5, 6, 10, 0).isoformat(),
+        "fecha_fin": datetime(2024, 5, 6, 11, 30).isoformat()
+    })
+
+def contenido_compacto():
+    return encode_compact(1234, 12, datetime(2024, 5, 6, 10, 0), datetime(2024, 5, 6, 11, 30),
+                          secret=b"clave-de-prueba")
+
+def generar_png(contenido):
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L,
+                       box_size=10, border=4)
+    qr.add_data(contenido)
+    qr.make(fit=True)
+    salida = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(salida, format="PNG")
+    return qr.version, salida.getvalue()
+
+def medir(funcion, *args):
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        resultado = funcion(*args)
+    return (time.perf_counter() - inicio) / REPETICIONES, resultado
+
+def main():
+    try:
+        from pyzbar.pyzbar import decode
+    except ImportError:
+        decode = None
+    print(f"{'formato':>9} {'caracteres':>10} {'versión':>7} {'png (bytes)':>11} "
+          f"{'generar (ms)':>12} {'decodificar (ms)':>16}")
+    for nombre, contenido in (("json", contenido_json()), ("compacto", contenido_compacto())):
+        tiempo_generar, (version, png) = medir(generar_png, contenido)
+        if decode:
+            imagen = Image.open(io.BytesIO(png)).convert("L")
+            tiempo_decodificar = f"{medir(decode, imagen)[0] * 1e3:>16.2f}"
+        else:
+            tiempo_decodificar = f"{'(sin pyzbar)':>16}"
+        print(f"{nombre:>9} {len(contenido):>10} {version:>7} {len(png):>11} "
+              f"{tiempo_generar * 1e3:>12.2f} {tiempo_decodificar}")
+
+if __name__ == "__main__":
+    main()
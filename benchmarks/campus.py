@@ -0,0 +1,174 @@
+"""Generador reproducible de campus sintéticos para los benchmarks.
+
+Un campus tiene salas con capacidades y equipamiento variados, docentes y un
+semestre de reservas de lunes a viernes sin superposiciones por sala. Las
+horas de inicio se concentran a media mañana y a primera hora de la tarde, y
+algunas salas son más demandadas que otras. La misma semilla genera siempre
+el mismo campus.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.campus 100000
+"""
+import random
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import List, Tuple
+from modules.salas import GestorSalas, Sala
+
+SEMILLA = 42
+
+# Semestre de 18 semanas, de 8:00 a 22:00 en bloques de media hora
+INICIO_SEMESTRE = datetime(2025, 3, 3, 8, 0)
+SEMANAS = 18
+BLOQUES_POR_DIA = 28
+MINUTOS_BLOQUE = 30
+
+# Reservas por sala en promedio (aprox. la mitad del horario ocupado)
+RESERVAS_POR_SALA = 400
+RESERVAS_POR_DOCENTE = 50
+
+# (capacidad, peso)
+CAPACIDADES = [(15, 10), (20, 20), (30, 30), (40, 20), (60, 12), (120, 8)]
+
+# (peso, proyector, pizarra digital, accesible)
+EQUIPAMIENTOS = [
+    (35, True, False, True),
+    (20, True, True, True),
+    (15, False, False, True),
+    (15, True, False, False),
+    (10, False, True, False),
+    (5, True, True, False),
+]
+
+# Peso de cada hora de inicio (8:00 a 21:00)
+PESOS_HORA = [6, 9, 10, 10, 7, 5, 8, 9, 8, 6, 5, 4, 3, 2]
+
+# (duración en bloques, peso)
+DURACIONES = [(2, 50), (3, 25), (4, 20), (6, 5)]
+
+@dataclass
+class Campus:
+    semilla: int
+    salas: List[Sala]
+    docentes: List[str]
+    reservas: List[Tuple[int, str, datetime, datetime]]  # (sala_id, email, inicio, fin) por inicio
+
+    @property
+    def desde(self) -> datetime:
+        return INICIO_SEMESTRE
+
+    @property
+    def hasta(self) -> datetime:
+        return INICIO_SEMESTRE + timedelta(weeks=SEMANAS)
+
+def _elegir(rng, opciones, acumulados, cantidad=1):
+    return rng.choices(opciones, cum_weights=acumulados, k=cantidad)
+
+def generar_salas(cantidad: int, rng: random.Random) -> List[Sala]:
+    capacidades = _elegir(rng, [c for c, _ in CAPACIDADES],
+                          list(accumulate(p for _, p in CAPACIDADES)), cantidad)
+    equipos = _elegir(rng, [e[1:] for e in EQUIPAMIENTOS],
+                      list(accumulate(e[0] for e in EQUIPAMIENTOS)), cantidad)
+    return [Sala(i + 1, f"Sala {i + 1:04d}", capacidad, *equipo)
+            for i, (capacidad, equipo) in enumerate(zip(capacidades, equipos))]
+
+def generar_campus(reservas: int, semilla: int = SEMILLA) -> Campus:
+    """Campus con `reservas` reservas y las salas y docentes necesarios para alojarlas"""
+    rng = random.Random(semilla)
+    salas = generar_salas(max(10, -(-reservas // RESERVAS_POR_SALA)), rng)
+    docentes = [f"docente{i + 1}@campus.edu" for i in range(max(20, reservas // RESERVAS_POR_DOCENTE))]
+    dias = [INICIO_SEMESTRE + timedelta(days=7 * semana + dia) for semana in range(SEMANAS) for dia in range(5)]
+
+    # Demanda por sala: unas pocas salas concentran más pedidos
+    demanda = list(accumulate(1 / (1 + i % 50) ** 0.5 for i in range(len(salas))))
+    horas = list(accumulate(PESOS_HORA))
+    duraciones = list(accumulate(p for _, p in DURACIONES))
+    opciones_duracion = [d for d, _ in DURACIONES]
+
+    # Bloques ocupados por (sala, día) como máscara de bits
+    ocupados = {}
+    generadas = []
+    while len(generadas) < reservas:
+        lote = reservas - len(generadas)
+        for sala, dia, hora, duracion, media, docente in zip(
+                _elegir(rng, salas, demanda, lote),
+                rng.choices(range(len(dias)), k=lote),
+                _elegir(rng, range(len(PESOS_HORA)), horas, lote),
+                _elegir(rng, opciones_duracion, duraciones, lote),
+                rng.choices((0, 1), k=lote),
+                rng.choices(docentes, k=lote)):
+            bloque = 2 * hora + media
+            if bloque + duracion > BLOQUES_POR_DIA:
+                continue
+            mascara = ((1 << duracion) - 1) << bloque
+            clave = (sala.id, dia)
+            if ocupados.get(clave, 0) & mascara:
+                continue
+            ocupados[clave] = ocupados.get(clave, 0) | mascara
+            inicio = dias[dia] + timedelta(minutes=MINUTOS_BLOQUE * bloque)
+            generadas.append((sala.id, docente, inicio, inicio + timedelta(minutes=MINUTOS_BLOQUE * duracion)))
+    generadas.sort(key=lambda reserva: (reserva[2], reserva[0]))
+    return Campus(semilla, salas, docentes, generadas)
+
+def poblar_gestor(campus: Campus, **opciones) -> GestorSalas:
+    """GestorSalas con las salas y reservas del campus"""
+    gestor = GestorSalas(salas=campus.salas, **opciones)
+    for sala_id, email, inicio, fin in campus.reservas:
+        gestor.crear_reserva(sala_id, email, inicio, fin)
+    return gestor
+
+def registros(campus: Campus) -> Tuple[dict, dict, dict]:
+    """Salones, usuarios y reservas del campus en el formato de modules.storage"""
+    creado = (INICIO_SEMESTRE - timedelta(days=30)).isoformat()
+    rooms = {str(sala.id): {
+        "name": sala.nombre,
+        "capacity": sala.capacidad,
+        "location": f"Edificio {chr(ord('A') + sala.id % 8)}",
+        "equipment": [nombre for nombre, tiene in (("projector", sala.tiene_proyector),
+                                                   ("digital_whiteboard", sala.tiene_pizarra_digital),
+                                                   ("accessible", sala.es_accesible)) if tiene],
+        "status": "available",
+        "created_at": creado
+    } for sala in campus.salas}
+    ids_docentes = {email: str(i + 1) for i, email in enumerate(campus.docentes)}
+    users = {user_id: {
+        "email": email,
+        "password": "",
+        "name": email.split("@")[0],
+        "role": "teacher",
+        "created_at": creado,
+        "last_login": None
+    } for email, user_id in ids_docentes.items()}
+    reservations = {str(i + 1): {
+        "room_id": str(sala_id),
+        "user_id": ids_docentes[email],
+        "start_time": inicio.isoformat(),
+        "end_time": fin.isoformat(),
+        "purpose": "Clase",
+        "attendees": [],
+        "status": "pending",
+        "checked_in_at": None,
+        "created_at": creado
+    } for i, (sala_id, email, inicio, fin) in enumerate(campus.reservas)}
+    return rooms, users, reservations
+
+def poblar_almacenamiento(campus: Campus, storage):
+    """Guarda el campus en un backend de modules.storage (una escritura por colección)"""
+    for collection, records in zip(("rooms", "users", "reservations"), registros(campus)):
+        storage.save(collection, records)
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    campus = generar_campus(cantidad)
+    por_hora = [0] * 24
+    for _, _, inicio, _ in campus.reservas:
+        por_hora[inicio.hour] += 1
+    print(f"{len(campus.reservas)} reservas, {len(campus.salas)} salas, {len(campus.docentes)} docentes "
+          f"(semilla {campus.semilla})")
+    for hora in range(8, 22):
+        print(f"{hora:02d}:00 {por_hora[hora]:>9} {'#' * (60 * por_hora[hora] // max(por_hora))}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""Verifica que JournalStorage se recupera de una escritura cortada al final del diario.
+
+Crea reservas, modifica y borra algunas, y agrega al diario una última línea
+incompleta como la que deja una caída a mitad de escritura. Al reabrir el
+almacenamiento se verifica que:
+  - las reservas confirmadas siguen ahí y la línea cortada no se aplicó,
+  - el diario quedó truncado al último salto de línea,
+  - las operaciones nuevas se anexan y se reaplican bien al volver a abrirlo.
+También prueba una caída durante la compactación (instantánea escrita y
+diario sin vaciar). El código de salida es 1 si alguna verificación falla.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.recuperacion_diario
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from modules.storage import JournalStorage
+
+RESERVAS = 50
+
+# Una entrada "put" cortada antes de terminar (sin salto de línea)
+LINEA_CORTADA = b'{"op": "put", "key": "999", "record": {"room_id": "1", "sta'
+
+def reserva(i):
+    inicio = datetime(2024, 3, 4, 8, 0) + timedelta(hours=i)
+    return {
+        "room_id": str(i % 5 + 1),
+        "user_id": str(i % 7 + 1),
+        "start_time": inicio.isoformat(),
+        "end_time": (inicio + timedelta(hours=1)).isoformat(),
+        "purpose": "Clase",
+        "attendees": [],
+        "status": "pending",
+        "checked_in_at": None,
+        "created_at": datetime(2024, 3, 1).isoformat()
+    }
+
+def abrir(files):
+    # Sin compactar durante la prueba para que todo quede en el diario
+    return JournalStorage(files, compact_every=10**9, fsync=False)
+
+def main():
+    fallas = []
+
+    def verificar(condicion, descripcion):
+        print(f"{'ok   ' if condicion else 'FALLA'} {descripcion}")
+        if not condicion:
+            fallas.append(descripcion)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        files = {name: os.path.join(directorio, f"{name}.json")
+                 for name in ("rooms", "users", "reservations")}
+        storage = abrir(files)
+        keys = storage.insert_many("reservations", [reserva(i) for i in range(RESERVAS)])
+        storage.put("reservations", keys[0], dict(reserva(0), status="cancelled"))
+        storage.delete("reservations", keys[1])
+        esperadas = storage.load("reservations")
+        diario = storage.journal_path("reservations")
+        tamano = os.path.getsize(diario)
+
+        # Caída a mitad de una escritura
+        with open(diario, "ab") as f:
+            f.write(LINEA_CORTADA)
+
+        storage = abrir(files)
+        recuperadas = storage.load("reservations")
+        verificar(recuperadas == esperadas, f"las {len(esperadas)} reservas confirmadas sobreviven")
+        verificar("999" not in recuperadas, "la línea cortada no se aplica")
+        verificar(os.path.getsize(diario) == tamano, "el diario se trunca al último salto de línea")
+
+        nueva = storage.insert("reservations", reserva(RESERVAS))
+        storage.put("reservations", keys[2], dict(reserva(2), status="cancelled"))
+        esperadas = storage.load("reservations")
+
+        storage = abrir(files)
+        recuperadas = storage.load("reservations")
+        verificar(recuperadas == esperadas, "las operaciones posteriores se reaplican al reabrir")
+        verificar(nueva in recuperadas and recuperadas[keys[2]]["status"] == "cancelled",
+                  "la reserva nueva y el cambio están en el diario")
+
+        # Caída durante la compactación: instantánea escrita, diario sin vaciar
+        with open(diario, "rb") as f:
+            contenido = f.read()
+        storage.compact("reservations")
+        with open(diario, "wb") as f:
+            f.write(contenido + LINEA_CORTADA)
+        recuperadas = abrir(files).load("reservations")
+        verificar(recuperadas == esperadas, "reaplicar el diario sobre la instantánea es inofensivo")
+
+    print(f"{len(fallas)} verificaciones fallidas")
+    sys.exit(1 if fallas else 0)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
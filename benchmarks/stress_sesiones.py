@@ -0,0 +1,59 @@
+"""Simula muchas sesiones reservando a la vez sobre un mismo gestor.
+
+Cada sesión intenta reservar los mismos bloques horarios en las mismas salas;
+al final se verifica que ninguna sala quedó con reservas vigentes
+superpuestas. El gestor no libera por ausencia ni inicia el planificador, así
+que ninguna reserva cambia de estado ni deja su horario libre durante la prueba.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.stress_sesiones
+"""
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from modules.salas import ESTADOS_VIGENTES, GestorSalas
+
+SESIONES = 200
+INTENTOS_POR_SESION = 50
+BLOQUES = 40
+
+def sesion(gestor, numero, barrera):
+    rng = random.Random(numero)
+    base = datetime(2024, 3, 4, 8, 0)
+    barrera.wait()
+    for _ in range(INTENTOS_POR_SESION):
+        sala = rng.choice(gestor.salas)
+        inicio = base + timedelta(minutes=30 * rng.randrange(BLOQUES))
+        gestor.crear_reserva(sala.id, f"docente{numero}@test.com",
+                             inicio, inicio + timedelta(minutes=rng.choice([30, 60, 90])))
+
+def verificar(gestor):
+    """Devuelve la cantidad de pares de reservas vigentes superpuestas"""
+    conflictos = 0
+    for sala in gestor.salas:
+        vigentes = sorted((r for r in gestor.reservas if r.sala_id == sala.id and r.estado in ESTADOS_VIGENTES),
+                          key=lambda r: r.fecha_inicio)
+        for anterior, siguiente in zip(vigentes, vigentes[1:]):
+            if siguiente.fecha_inicio < anterior.fecha_fin:
+                conflictos += 1
+    return conflictos
+
+def main():
+    gestor = GestorSalas(gracia_no_show=None)
+    barrera = threading.Barrier(SESIONES)
+    hilos = [threading.Thread(target=sesion, args=(gestor, i, barrera)) for i in range(SESIONES)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+    conflictos = verificar(gestor)
+    print(f"{SESIONES} sesiones, {SESIONES * INTENTOS_POR_SESION} intentos en {duracion:.2f} s")
+    print(f"reservas creadas: {len(gestor.reservas)}, reservas superpuestas: {conflictos}")
+    sys.exit(1 if conflictos else 0)
+
+if __name__ == "__main__":
+    main()
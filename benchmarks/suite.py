@@ -0,0 +1,250 @@
+"""Latencia (p50/p95/p99) y memoria de las operaciones principales según el tamaño del campus.
+
+Para cada tamaño genera un campus con benchmarks.campus y mide:
+  - buscar_salas_disponibles sobre GestorSalas,
+  - create_reservation, check_room_availability, load_reservations y
+    save_reservations sobre el backend de almacenamiento elegido,
+  - QRManager.generar_qr con datos de reservas distintas.
+La memoria de cada operación es el pico de asignaciones de Python durante
+unas llamadas extra (tracemalloc); también se anota la memoria residente del
+proceso con los datos cargados. Los resultados se guardan en JSON junto con
+el commit para comparar corridas.
+
+Los backends json y journal tienen todas las reservas en memoria (varias
+veces el tamaño del archivo), así que solo aceptan hasta LIMITE_EN_MEMORIA
+reservas; el millón se mide con sqlite.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.suite
+    python -m benchmarks.suite --tamanos 1000 100000 1000000 --backend sqlite
+    python -m benchmarks.suite --comparar benchmarks/resultados/a.json benchmarks/resultados/b.json
+
+Con --comparar el código de salida es 1 si algún p95 empeoró más que la
+tolerancia (--tolerancia, 1.10 por defecto).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from itertools import count, repeat
+from benchmarks.campus import SEMILLA, generar_campus, poblar_almacenamiento, poblar_gestor
+from modules.qr import QRManager
+from modules.reservations import (
+    check_room_availability, create_reservation, load_reservations, save_reservations
+)
+from modules.storage import JSONStorage, JournalStorage, SQLiteStorage, set_storage
+
+TAMANOS = [1_000, 100_000]
+LIMITE_EN_MEMORIA = 100_000
+DIRECTORIO_RESULTADOS = os.path.join("benchmarks", "resultados")
+
+# Muestras por operación: las baratas siempre MUESTRAS; las que recorren o
+# reescriben todas las reservas, según el tamaño y con un mínimo
+MUESTRAS = 1_000
+PRESUPUESTO_CARAS = 200_000
+MIN_MUESTRAS = 5
+LLAMADAS_MEMORIA = 3
+
+# Cociente de p95 a partir del cual la comparación marca una regresión
+TOLERANCIA = 1.10
+
+def crear_storage(backend, directorio):
+    files = {c: os.path.join(directorio, f"{c}.json") for c in ("rooms", "users", "reservations")}
+    if backend == "journal":
+        return JournalStorage(files, fsync=False)
+    if backend == "sqlite":
+        return SQLiteStorage(os.path.join(directorio, "salas.db"))
+    return JSONStorage(files)
+
+def memoria_residente_mb():
+    """Memoria residente actual del proceso (Linux) o, si no, el máximo alcanzado"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentil(ordenadas, q):
+    """Percentil por rango más cercano"""
+    return ordenadas[max(0, -(-len(ordenadas) * q // 100) - 1)]
+
+def medir(operacion, argumentos, muestras):
+    """Latencias de `operacion(*args)` con los siguientes args de `argumentos`, y su pico de memoria"""
+    latencias = []
+    for _ in range(muestras):
+        args = next(argumentos)
+        inicio = time.perf_counter_ns()
+        operacion(*args)
+        latencias.append(time.perf_counter_ns() - inicio)
+    latencias.sort()
+    tracemalloc.start()
+    pico = 0
+    for _ in range(LLAMADAS_MEMORIA):
+        args = next(argumentos)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        operacion(*args)
+        pico = max(pico, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return {
+        "muestras": muestras,
+        "p50_ms": percentil(latencias, 50) / 1e6,
+        "p95_ms": percentil(latencias, 95) / 1e6,
+        "p99_ms": percentil(latencias, 99) / 1e6,
+        "memoria_kb": pico / 1024,
+    }
+
+def horarios(campus, rng, desplazamiento=timedelta(0)):
+    """Genera horarios (sala, inicio, fin) al azar dentro del semestre, en bloques de media hora"""
+    bloques = int((campus.hasta - campus.desde).total_seconds() // 1800)
+    while True:
+        inicio = campus.desde + desplazamiento + timedelta(minutes=30 * rng.randrange(bloques))
+        yield rng.choice(campus.salas), inicio, inicio + timedelta(minutes=30 * rng.choice((2, 3, 4)))
+
+def medir_gestor(campus, rng):
+    gestor = poblar_gestor(campus)
+    filtros = [{}, {"capacidad_min": 30}, {"capacidad_min": 40, "requiere_proyector": True},
+               {"requiere_pizarra": True, "requiere_accesible": True}]
+    consultas = ((inicio, fin, rng.choice(filtros)) for _, inicio, fin in horarios(campus, rng))
+    resultado = medir(lambda inicio, fin, requisitos: gestor.buscar_salas_disponibles(inicio, fin, **requisitos),
+                      consultas, MUESTRAS)
+    resultado["memoria_proceso_mb"] = memoria_residente_mb()
+    return {"buscar_salas_disponibles": resultado}
+
+def medir_almacenamiento(campus, rng, backend, muestras_caras):
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        storage = crear_storage(backend, directorio)
+        set_storage(storage)
+        try:
+            poblar_almacenamiento(campus, storage)
+            docentes = [str(i + 1) for i in range(len(campus.docentes))]
+            consultas = ((str(sala.id), inicio.isoformat(), fin.isoformat())
+                         for sala, inicio, fin in horarios(campus, rng))
+            resultados["check_room_availability"] = medir(check_room_availability, consultas, MUESTRAS)
+            # Las reservas nuevas van al semestre siguiente para no chocar con las existentes
+            nuevas = ((str(sala.id), rng.choice(docentes), inicio.isoformat(), fin.isoformat(), "Clase")
+                      for sala, inicio, fin in horarios(campus, rng, campus.hasta - campus.desde))
+            resultados["create_reservation"] = medir(create_reservation, nuevas, muestras_caras)
+            resultados["load_reservations"] = medir(load_reservations, repeat(()), muestras_caras)
+            reservas = load_reservations()
+            resultados["save_reservations"] = medir(save_reservations, repeat((reservas,)), muestras_caras)
+            del reservas
+            memoria = memoria_residente_mb()
+            for resultado in resultados.values():
+                resultado["memoria_proceso_mb"] = memoria
+        finally:
+            set_storage(None)
+    return resultados
+
+def medir_qr(campus, rng):
+    QRManager.cache.clear()
+    datos = ((rng.randrange(1, 10**9), sala_id, email, inicio, fin)
+             for sala_id, email, inicio, fin in (rng.choice(campus.reservas) for _ in count()))
+    resultado = medir(QRManager.generar_qr, datos, min(MUESTRAS, 200))
+    resultado["memoria_proceso_mb"] = memoria_residente_mb()
+    return {"QRManager.generar_qr": resultado}
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def correr(tamanos, backend, semilla):
+    resultados = {}
+    for tamano in tamanos:
+        rng = random.Random(semilla)
+        inicio = time.perf_counter()
+        campus = generar_campus(tamano, semilla)
+        muestras_caras = max(MIN_MUESTRAS, min(MUESTRAS, PRESUPUESTO_CARAS // tamano))
+        operaciones = {}
+        operaciones.update(medir_gestor(campus, rng))
+        gc.collect()
+        operaciones.update(medir_almacenamiento(campus, rng, backend, muestras_caras))
+        gc.collect()
+        operaciones.update(medir_qr(campus, rng))
+        resultados[str(tamano)] = {
+            "salas": len(campus.salas),
+            "docentes": len(campus.docentes),
+            "segundos": time.perf_counter() - inicio,
+            "operaciones": operaciones,
+        }
+        del campus
+        gc.collect()
+        imprimir_tamano(tamano, resultados[str(tamano)])
+    return resultados
+
+def imprimir_tamano(tamano, resultado):
+    print(f"\n{tamano} reservas, {resultado['salas']} salas ({resultado['segundos']:.1f} s)")
+    print(f"{'operación':>26} {'muestras':>9} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} "
+          f"{'mem. KB':>10} {'RSS MB':>8}")
+    for nombre, datos in resultado["operaciones"].items():
+        print(f"{nombre:>26} {datos['muestras']:>9} {datos['p50_ms']:>10.3f} {datos['p95_ms']:>10.3f} "
+              f"{datos['p99_ms']:>10.3f} {datos['memoria_kb']:>10.1f} "
+              f"{datos.get('memoria_proceso_mb', 0):>8.0f}")
+
+def comparar(ruta_anterior, ruta_actual, tolerancia=TOLERANCIA):
+    """Compara el p95 de dos corridas; devuelve cuántas operaciones empeoraron más que `tolerancia`"""
+    with open(ruta_anterior) as f:
+        anterior = json.load(f)
+    with open(ruta_actual) as f:
+        actual = json.load(f)
+    print(f"{anterior.get('commit')} -> {actual.get('commit')} (p95, ms)")
+    print(f"{'reservas':>10} {'operación':>26} {'antes':>10} {'después':>10} {'cociente':>9}")
+    regresiones = 0
+    for tamano, datos in actual["resultados"].items():
+        previos = anterior["resultados"].get(tamano, {}).get("operaciones", {})
+        for nombre, medida in datos["operaciones"].items():
+            if nombre not in previos:
+                continue
+            antes, despues = previos[nombre]["p95_ms"], medida["p95_ms"]
+            cociente = despues / antes if antes else float("inf")
+            marca = " regresión" if cociente > tolerancia else ""
+            regresiones += bool(marca)
+            print(f"{tamano:>10} {nombre:>26} {antes:>10.3f} {despues:>10.3f} {cociente:>9.2f}{marca}")
+    return regresiones
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS)
+    parser.add_argument("--backend", choices=("json", "journal", "sqlite"), default="json")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto en benchmarks/resultados)")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTERIOR", "ACTUAL"))
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    args = parser.parse_args()
+    if args.comparar:
+        raise SystemExit(1 if comparar(*args.comparar, args.tolerancia) else 0)
+    if args.backend != "sqlite" and max(args.tamanos) > LIMITE_EN_MEMORIA:
+        parser.error(f"el backend {args.backend} admite hasta {LIMITE_EN_MEMORIA} reservas; "
+                     f"use --backend sqlite para tamaños mayores")
+
+    commit = commit_actual()
+    corrida = {
+        "commit": commit,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "backend": args.backend,
+        "semilla": args.semilla,
+        "resultados": correr(args.tamanos, args.backend, args.semilla),
+    }
+    salida = args.salida or os.path.join(
+        DIRECTORIO_RESULTADOS, f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'sin-commit'}-{args.backend}.json")
+    os.makedirs(os.path.dirname(salida) or ".", exist_ok=True)
+    with open(salida, "w") as f:
+        json.dump(corrida, f, indent=4)
+    print(f"\nResultados en {salida}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
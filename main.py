@@ -5,17 +5,20 @@ from flet import (
     DatePicker, TimePicker, ProgressBar, alignment
 )
 from datetime import datetime, timedelta
+from itertools import chain
+import threading
 from modules.auth import Auth
-from modules.salas import GestorSalas, Sala, Reserva
+from modules.salas import ESTADOS_VIGENTES, Sala, Reserva, obtener_gestor_salas
 from modules.qr import QRManager
-from modules.capacitacion import GestorCapacitacion, Tutorial
-from modules.reservations import cancelar_reserva, cancelar_reserva_admin
+from modules.capacitacion import Tutorial, obtener_gestor_capacitacion
+from modules.analytics import DIAS_SEMANA, calcular_ocupacion_intervalos, horas_pico, salas_ociosas, utilizacion_por_sala
+from modules.tareas import Navegacion, obtener_ejecutor_tareas
+from modules.eventos import obtener_bus_eventos
 from modules.styles import (
     COLORS, primary_button, secondary_button, card, section,
     text_field, title, subtitle, caption, success_message, 
-    error_message, nav_button, divider_with_text, SPACING
+    error_message, nav_button, divider_with_text, paged_list_view, SPACING
 )
-import base64
 
 def main(page: Page):
     page.title = "Sistema de Gestión de Salas"
@@ -27,12 +30,26 @@ def main(page: Page):
     page.window_resizable = True
     page.window_maximized = True
 
-    # Instancias de los gestores
-    gestor_salas = GestorSalas()
-    gestor_capacitacion = GestorCapacitacion()
+    # Gestores compartidos por todas las sesiones
+    gestor_salas = obtener_gestor_salas()
+    gestor_capacitacion = obtener_gestor_capacitacion()
     usuario_actual = None
     rol_actual = None
 
+    # Trabajos de almacenamiento y QR fuera de los manejadores de eventos
+    ejecutor = obtener_ejecutor_tareas()
+    medir = ejecutor.metricas.medir
+    navegacion = Navegacion()
+    indicador_progreso = ProgressBar(visible=False)
+    page.overlay.append(indicador_progreso)
+    tareas_en_curso = 0
+    tareas_lock = threading.Lock()
+    
+    # Cambios de reservas hechos desde cualquier sesión; la vista actual registra
+    # en oyentes_vista cómo aplicarlos sobre sus controles, sin reconstruirse
+    bus_eventos = obtener_bus_eventos()
+    oyentes_vista = []
+
     # Componentes de la interfaz de login
     email_field = text_field(
         label="Correo electrónico",
@@ -63,6 +80,76 @@ def main(page: Page):
         success_banner.visible = True
         page.update()
 
+    def nueva_vista():
+        """Limpia la página; los resultados de tareas de la vista anterior se descartan"""
+        navegacion.avanzar()
+        oyentes_vista.clear()
+        page.clean()
+
+    def al_cambiar_reserva(evento):
+        """Suscriptor del bus: pasa el cambio a los oyentes de la vista actual"""
+        version = navegacion.actual
+        for oyente in list(oyentes_vista):
+            if navegacion.vigente(version):
+                oyente(evento.datos, evento.accion)
+
+    bus_eventos.suscribir("reservas", al_cambiar_reserva)
+    page.on_close = lambda e: bus_eventos.desuscribir("reservas", al_cambiar_reserva)
+
+    def tarjeta_reserva_en_vivo(reserva, tarjetas: dict, al_cancelar, *lineas):
+        """Tarjeta de una reserva cuyo estado y botón Cancelar se actualizan con los eventos"""
+        sala = gestor_salas.obtener_sala(reserva.sala_id)
+        estado = Text(f"Estado: {reserva.estado}")
+        acciones = Row([
+            primary_button("Cancelar", on_click=lambda e: al_cancelar(reserva))
+        ] if reserva.estado in ESTADOS_VIGENTES else [])
+        tarjetas[reserva.id] = (estado, acciones)
+        return card(Column([
+            subtitle(sala.nombre),
+            *lineas,
+            Text(f"Fecha: {reserva.fecha_inicio.strftime('%d/%m/%Y')}"),
+            Text(f"Hora: {reserva.fecha_inicio.strftime('%H:%M')} - {reserva.fecha_fin.strftime('%H:%M')}"),
+            estado,
+            acciones
+        ]))
+
+    def actualizar_tarjeta(reserva, estado: Text, acciones: Row):
+        """Envía solo el estado y las acciones de una tarjeta ya mostrada"""
+        estado.value = f"Estado: {reserva.estado}"
+        if reserva.estado not in ESTADOS_VIGENTES:
+            acciones.controls.clear()
+        page.update(estado, acciones)
+
+    def en_segundo_plano(trabajo, al_terminar):
+        """Ejecuta `trabajo` en el ejecutor mostrando el indicador de progreso"""
+        nonlocal tareas_en_curso
+        with tareas_lock:
+            tareas_en_curso += 1
+            indicador_progreso.visible = True
+        page.update()
+        
+        def al_fallar(error):
+            print(f"Error en segundo plano: {str(error)}")
+            show_error("Ocurrió un error, intente nuevamente")
+        
+        def al_finalizar():
+            nonlocal tareas_en_curso
+            with tareas_lock:
+                tareas_en_curso -= 1
+                indicador_progreso.visible = tareas_en_curso > 0
+            page.update()
+        
+        ejecutor.ejecutar(trabajo, al_terminar, al_fallar, al_finalizar, navegacion)
+
+    def avisar_asignacion(solicitud, reserva):
+        """Aviso de la lista de espera (llega desde otro hilo, sin importar la vista actual)"""
+        sala = gestor_salas.obtener_sala(reserva.sala_id)
+        page.open(ft.SnackBar(
+            content=Text(f"Se liberó {sala.nombre}: tu reserva del {reserva.fecha_inicio.strftime('%d/%m/%Y %H:%M')} "
+                         f"quedó confirmada"),
+            bgcolor=COLORS["success"],
+        ))
+
     def back_button():
         """Crea un botón de retroceso estándar"""
         return Container(
@@ -108,22 +195,29 @@ def main(page: Page):
         else:
             show_login()
 
+    @medir("login")
     def login_clicked(e):
-        nonlocal usuario_actual, rol_actual
-        success, role = Auth.login(email_field.value, password_field.value)
-        if success:
-            error_banner.visible = False
-            usuario_actual = email_field.value
-            rol_actual = role
-            if role == "docente":
-                show_docente_dashboard()
-            elif role == "administrativo":
-                show_admin_dashboard()
-        else:
-            show_error("Credenciales incorrectas")
+        email = email_field.value
+        password = password_field.value
+        
+        def al_terminar(resultado):
+            nonlocal usuario_actual, rol_actual
+            success, role = resultado
+            if success:
+                error_banner.visible = False
+                usuario_actual = email
+                rol_actual = role
+                if role == "docente":
+                    show_docente_dashboard()
+                elif role == "administrativo":
+                    show_admin_dashboard()
+            else:
+                show_error("Credenciales incorrectas")
+        
+        en_segundo_plano(lambda: Auth.login(email, password), al_terminar)
 
     def show_reserva_form():
-        page.clean()
+        nueva_vista()
         page.add(back_button())  # Agregar botón de retroceso
         
         # Componentes del formulario
@@ -134,7 +228,10 @@ def main(page: Page):
         proyector_check = Checkbox(label="Requiere proyector")
         pizarra_check = Checkbox(label="Requiere pizarra digital")
         accesible_check = Checkbox(label="Requiere accesibilidad")
+        repetir_check = Checkbox(label="Repetir semanalmente")
+        semanas_field = text_field("Número de semanas", width=300)
         
+        @medir("buscar_salas")
         def buscar_salas(e):
             try:
                 fecha = fecha_picker.value
@@ -148,72 +245,141 @@ def main(page: Page):
                 
                 fecha_inicio = datetime.combine(fecha, hora_inicio)
                 fecha_fin = datetime.combine(fecha, hora_fin)
+                if fecha_fin <= fecha_inicio:
+                    show_error("La hora de fin debe ser posterior a la de inicio")
+                    return
                 
-                salas_disponibles = gestor_salas.buscar_salas_disponibles(
-                    fecha_inicio=fecha_inicio,
-                    fecha_fin=fecha_fin,
+                requisitos = dict(
                     capacidad_min=capacidad,
                     requiere_proyector=proyector_check.value,
                     requiere_pizarra=pizarra_check.value,
                     requiere_accesible=accesible_check.value
                 )
                 
-                mostrar_resultados(salas_disponibles, fecha_inicio, fecha_fin)
+                def trabajo():
+                    salas_disponibles = gestor_salas.buscar_salas_disponibles(fecha_inicio, fecha_fin, **requisitos)
+                    if salas_disponibles:
+                        return salas_disponibles, [], [], []
+                    # Sin salas libres: proponer otros horarios, otras salas y la lista de espera
+                    return (
+                        salas_disponibles,
+                        gestor_salas.sugerir_horarios(fecha_fin - fecha_inicio, fecha_inicio, **requisitos),
+                        gestor_salas.salas_alternativas(fecha_inicio, fecha_fin, **requisitos),
+                        gestor_salas.salas_compatibles(**requisitos)
+                    )
+                
+                def al_terminar(resultado):
+                    mostrar_resultados(resultado[0], fecha_inicio, fecha_fin, *resultado[1:])
+                
+                en_segundo_plano(trabajo, al_terminar)
                 
             except ValueError:
                 show_error("Por favor ingrese valores válidos")
 
-        def mostrar_resultados(salas: list[Sala], fecha_inicio: datetime, fecha_fin: datetime):
+        def tarjeta_sala(sala: Sala, fecha_inicio: datetime, fecha_fin: datetime, horario=False):
+            card_content = Column([
+                subtitle(sala.nombre),
+                *([Text(f"{fecha_inicio.strftime('%d/%m/%Y')} de {fecha_inicio.strftime('%H:%M')} a {fecha_fin.strftime('%H:%M')}")]
+                  if horario else []),
+                Text(f"Capacidad: {sala.capacidad} personas"),
+                Text(f"Proyector: {'Sí' if sala.tiene_proyector else 'No'}"),
+                Text(f"Pizarra digital: {'Sí' if sala.tiene_pizarra_digital else 'No'}"),
+                Text(f"Accesible: {'Sí' if sala.es_accesible else 'No'}"),
+                primary_button(
+                    "Reservar",
+                    on_click=lambda e: reservar_sala(sala, fecha_inicio, fecha_fin)
+                )
+            ])
+            return card(card_content)
+
+        def mostrar_resultados(salas: list[Sala], fecha_inicio: datetime, fecha_fin: datetime,
+                               sugerencias=(), alternativas=(), compatibles=()):
             resultados_container.controls.clear()
             
             if not salas:
                 resultados_container.controls.append(
                     error_message("No se encontraron salas disponibles")
                 )
+                if compatibles:
+                    resultados_container.controls.append(secondary_button(
+                        "Avisarme si se libera una sala",
+                        on_click=lambda e: unirse_lista_espera(e.control, compatibles, fecha_inicio, fecha_fin)
+                    ))
+                if sugerencias:
+                    resultados_container.controls.append(subtitle("Próximos horarios disponibles"))
+                    resultados_container.controls.extend(
+                        tarjeta_sala(sala, inicio, fin, horario=True) for sala, inicio, fin in sugerencias
+                    )
+                if alternativas:
+                    resultados_container.controls.append(subtitle("Otras salas libres en ese horario"))
+                    resultados_container.controls.extend(
+                        tarjeta_sala(sala, fecha_inicio, fecha_fin) for sala in alternativas
+                    )
             else:
                 for sala in salas:
-                    card_content = Column([
-                        subtitle(sala.nombre),
-                        Text(f"Capacidad: {sala.capacidad} personas"),
-                        Text(f"Proyector: {'Sí' if sala.tiene_proyector else 'No'}"),
-                        Text(f"Pizarra digital: {'Sí' if sala.tiene_pizarra_digital else 'No'}"),
-                        Text(f"Accesible: {'Sí' if sala.es_accesible else 'No'}"),
-                        primary_button(
-                            "Reservar",
-                            on_click=lambda e, s=sala: reservar_sala(s, fecha_inicio, fecha_fin)
-                        )
-                    ])
-                    resultados_container.controls.append(card(card_content))
+                    resultados_container.controls.append(tarjeta_sala(sala, fecha_inicio, fecha_fin))
             
             page.update()
 
-        def reservar_sala(sala: Sala, fecha_inicio: datetime, fecha_fin: datetime):
-            reserva = gestor_salas.crear_reserva(
-                sala_id=sala.id,
-                usuario_email=usuario_actual,
-                fecha_inicio=fecha_inicio,
-                fecha_fin=fecha_fin
+        @medir("unirse_lista_espera")
+        def unirse_lista_espera(boton, salas: list[Sala], fecha_inicio: datetime, fecha_fin: datetime):
+            usuario = usuario_actual
+            boton.disabled = True
+            page.update()
+            
+            def al_terminar(solicitud):
+                # Los resultados pueden haber cambiado por otra búsqueda entretanto
+                if boton in resultados_container.controls:
+                    resultados_container.controls[resultados_container.controls.index(boton)] = (
+                        success_message("Estás en la lista de espera; te avisaremos si se libera una sala")
+                        if solicitud else error_message("No se pudo anotar en la lista de espera")
+                    )
+                page.update()
+            
+            en_segundo_plano(
+                lambda: gestor_salas.unirse_lista_espera(
+                    usuario, fecha_inicio, fecha_fin, [sala.id for sala in salas], al_asignar=avisar_asignacion
+                ),
+                al_terminar
             )
+
+        @medir("reservar_sala")
+        def reservar_sala(sala: Sala, fecha_inicio: datetime, fecha_fin: datetime):
+            if repetir_check.value:
+                reservar_sala_semanal(sala, fecha_inicio, fecha_fin)
+                return
+            usuario = usuario_actual
             
-            if reserva:
-                # Generar QR
-                qr_bytes = QRManager.generar_qr(
+            def trabajo():
+                reserva = gestor_salas.crear_reserva(
+                    sala_id=sala.id,
+                    usuario_email=usuario,
+                    fecha_inicio=fecha_inicio,
+                    fecha_fin=fecha_fin
+                )
+                if not reserva:
+                    return None, None
+                # Generar QR (ya codificado en base64 para mostrarlo)
+                return reserva, QRManager.generar_qr_base64(
                     reserva_id=reserva.id,
                     sala_id=sala.id,
-                    usuario_email=usuario_actual,
+                    usuario_email=usuario,
                     fecha_inicio=fecha_inicio,
                     fecha_fin=fecha_fin
                 )
-                
+            
+            en_segundo_plano(trabajo, lambda resultado: mostrar_reserva(sala, fecha_inicio, fecha_fin, *resultado))
+        
+        def mostrar_reserva(sala: Sala, fecha_inicio: datetime, fecha_fin: datetime, reserva, qr_base64):
+            if reserva:
                 # Mostrar QR
-                qr_base64 = base64.b64encode(qr_bytes).decode()
                 qr_image = Image(
                     src_base64=qr_base64,
                     width=200,
                     height=200
                 )
                 
-                page.clean()
+                nueva_vista()
                 page.add(
                     Column([
                         title("¡Reserva exitosa!"),
@@ -232,6 +398,44 @@ def main(page: Page):
             else:
                 show_error("No se pudo realizar la reserva")
 
+        def reservar_sala_semanal(sala: Sala, fecha_inicio: datetime, fecha_fin: datetime):
+            try:
+                semanas = int(semanas_field.value)
+            except (TypeError, ValueError):
+                show_error("Por favor ingrese un número de semanas válido")
+                return
+            usuario = usuario_actual
+            en_segundo_plano(
+                lambda: gestor_salas.crear_reserva_recurrente(
+                    sala_id=sala.id,
+                    usuario_email=usuario,
+                    fecha_inicio=fecha_inicio,
+                    fecha_fin=fecha_fin,
+                    regla=f"FREQ=WEEKLY;COUNT={semanas}"
+                ),
+                lambda serie: mostrar_serie(sala, fecha_inicio, fecha_fin, serie)
+            )
+        
+        def mostrar_serie(sala: Sala, fecha_inicio: datetime, fecha_fin: datetime, serie):
+            if serie:
+                nueva_vista()
+                page.add(
+                    Column([
+                        title("¡Reserva exitosa!"),
+                        card(Column([
+                            Text(f"Sala: {sala.nombre}"),
+                            Text(f"Desde: {serie.fecha_inicio.strftime('%d/%m/%Y')} hasta: {serie.hasta.strftime('%d/%m/%Y')}"),
+                            Text(f"Hora: {fecha_inicio.strftime('%H:%M')} - {fecha_fin.strftime('%H:%M')} (cada semana)"),
+                            primary_button(
+                                "Volver al panel",
+                                on_click=lambda e: show_docente_dashboard()
+                            )
+                        ]))
+                    ], alignment=ft.MainAxisAlignment.CENTER)
+                )
+            else:
+                show_error("La sala no está disponible en todas las semanas solicitadas")
+
         # Contenedor de resultados
         resultados_container = Column(scroll=ft.ScrollMode.AUTO)
         
@@ -254,6 +458,8 @@ def main(page: Page):
                     proyector_check,
                     pizarra_check,
                     accesible_check,
+                    repetir_check,
+                    semanas_field,
                     primary_button("Buscar Salas", on_click=buscar_salas)
                 ])),
                 resultados_container
@@ -261,51 +467,91 @@ def main(page: Page):
         )
 
     def show_mis_reservas():
-        page.clean()
+        nueva_vista()
         page.add(back_button())  # Agregar botón de retroceso
         reservas = gestor_salas.obtener_reservas_usuario(usuario_actual)
+        series = gestor_salas.obtener_reservas_recurrentes_usuario(usuario_actual)
         
-        if not reservas:
+        usuario = usuario_actual
+        
+        if not reservas and not series:
             page.add(card(Text("No tienes reservas activas")))
+            # La primera reserva nueva (p. ej. desde la lista de espera) arma la vista
+            oyentes_vista.append(
+                lambda reserva, accion: show_mis_reservas()
+                if accion == "alta" and reserva.usuario_email == usuario else None
+            )
             return
         
-        reservas_container = Column(scroll=ft.ScrollMode.AUTO)
+        tarjetas = {}
+        
+        def tarjeta_reserva(reserva):
+            return tarjeta_reserva_en_vivo(reserva, tarjetas, handle_cancelar_reserva)
         
-        for reserva in reservas:
-            sala = next(s for s in gestor_salas.salas if s.id == reserva.sala_id)
+        def tarjeta_serie(serie):
+            sala = gestor_salas.obtener_sala(serie.sala_id)
             card_content = Column([
                 subtitle(sala.nombre),
-                Text(f"Fecha: {reserva.fecha_inicio.strftime('%d/%m/%Y')}"),
-                Text(f"Hora: {reserva.fecha_inicio.strftime('%H:%M')} - {reserva.fecha_fin.strftime('%H:%M')}"),
-                Text(f"Estado: {reserva.estado}"),
+                Text(f"Cada semana desde {serie.fecha_inicio.strftime('%d/%m/%Y')} hasta {serie.hasta.strftime('%d/%m/%Y')}"),
+                Text(f"Hora: {serie.fecha_inicio.strftime('%H:%M')} - {serie.fecha_fin.strftime('%H:%M')}"),
                 Row([
                     primary_button(
                         "Cancelar",
-                        on_click=lambda e, r=reserva: handle_cancelar_reserva(r)
-                    ) if reserva.estado != 'cancelada' else None
+                        on_click=lambda e, r=serie: handle_cancelar_reserva_recurrente(r)
+                    )
                 ])
             ])
-            reservas_container.controls.append(card(card_content))
+            return card(card_content)
         
+        # Las tarjetas se construyen por páginas a medida que se desplaza la lista
+        reservas_container = paged_list_view(chain(map(tarjeta_reserva, reservas), map(tarjeta_serie, series)))
+        
+        def al_cambiar(reserva, accion):
+            if reserva.id in tarjetas:
+                actualizar_tarjeta(reserva, *tarjetas[reserva.id])
+            elif accion == "alta" and reserva.usuario_email == usuario:
+                reservas_container.controls.insert(0, tarjeta_reserva(reserva))
+                reservas_container.update()
+        
+        oyentes_vista.append(al_cambiar)
         page.add(
             Column([
                 title("Mis Reservas"),
                 primary_button("Volver", on_click=lambda e: show_docente_dashboard()),
                 reservas_container
-            ])
+            ], expand=True)
         )
 
+    @medir("cancelar_reserva")
     def handle_cancelar_reserva(reserva):
         """Maneja la cancelación de una reserva"""
-        success, message = cancelar_reserva(reserva.id, usuario_actual)
-        if success:
-            show_success(message)
-            show_mis_reservas()  # Recargar la vista
-        else:
-            show_error(message)
+        if reserva.usuario_email != usuario_actual:
+            show_error("No tienes permiso para cancelar esta reserva")
+            return
+        
+        def al_terminar(cancelada):
+            # La tarjeta se actualiza con el evento de la cancelación
+            if cancelada:
+                show_success("Reserva cancelada exitosamente")
+            else:
+                show_error("La reserva ya no está vigente")
+        
+        en_segundo_plano(lambda: gestor_salas.cancelar_reserva(reserva.id), al_terminar)
+
+    @medir("cancelar_reserva_recurrente")
+    def handle_cancelar_reserva_recurrente(serie):
+        """Maneja la cancelación de una reserva semanal"""
+        def al_terminar(cancelada):
+            if cancelada:
+                show_success("Reserva cancelada exitosamente")
+                show_mis_reservas()  # Recargar la vista
+            else:
+                show_error("No se pudo cancelar la reserva")
+        
+        en_segundo_plano(lambda: gestor_salas.cancelar_reserva_recurrente(serie.id), al_terminar)
 
     def show_capacitacion():
-        page.clean()
+        nueva_vista()
         page.add(back_button())  # Agregar botón de retroceso
         tutoriales = gestor_capacitacion.obtener_tutoriales_pendientes(usuario_actual)
         progreso = gestor_capacitacion.obtener_progreso(usuario_actual)
@@ -348,7 +594,7 @@ def main(page: Page):
             show_error("No se pudo marcar como completado")
 
     def show_docente_dashboard():
-        page.clean()
+        nueva_vista()
         page.add(
             Column([
                 title("Panel del Docente"),
@@ -362,7 +608,7 @@ def main(page: Page):
         )
 
     def show_admin_dashboard():
-        page.clean()
+        nueva_vista()
         page.add(
             Column([
                 title("Panel del Administrador"),
@@ -376,72 +622,97 @@ def main(page: Page):
         )
 
     def show_gestion_reservas():
-        page.clean()
+        nueva_vista()
         page.add(back_button())  # Agregar botón de retroceso
-        todas_reservas = gestor_salas.reservas
+        # Copia: las reservas nuevas llegan por el bus y se insertan arriba
+        todas_reservas = list(gestor_salas.reservas)
+        tarjetas = {}
         
-        reservas_container = Column(scroll=ft.ScrollMode.AUTO)
+        def tarjeta_reserva(reserva):
+            return tarjeta_reserva_en_vivo(reserva, tarjetas, handle_cancelar_reserva_admin,
+                                           Text(f"Usuario: {reserva.usuario_email}"))
         
-        for reserva in todas_reservas:
-            sala = next(s for s in gestor_salas.salas if s.id == reserva.sala_id)
-            card_content = Column([
-                subtitle(sala.nombre),
-                Text(f"Usuario: {reserva.usuario_email}"),
-                Text(f"Fecha: {reserva.fecha_inicio.strftime('%d/%m/%Y')}"),
-                Text(f"Hora: {reserva.fecha_inicio.strftime('%H:%M')} - {reserva.fecha_fin.strftime('%H:%M')}"),
-                Text(f"Estado: {reserva.estado}"),
-                Row([
-                    primary_button(
-                        "Cancelar",
-                        on_click=lambda e, r=reserva: handle_cancelar_reserva_admin(r)
-                    ) if reserva.estado != 'cancelada' else None
-                ])
-            ])
-            reservas_container.controls.append(card(card_content))
+        # Las tarjetas se construyen por páginas a medida que se desplaza la lista
+        reservas_container = paged_list_view(map(tarjeta_reserva, todas_reservas))
+        
+        def al_cambiar(reserva, accion):
+            if reserva.id in tarjetas:
+                actualizar_tarjeta(reserva, *tarjetas[reserva.id])
+            elif accion == "alta":
+                reservas_container.controls.insert(0, tarjeta_reserva(reserva))
+                reservas_container.update()
         
+        oyentes_vista.append(al_cambiar)
         page.add(
             Column([
                 title("Gestión de Reservas"),
                 primary_button("Volver", on_click=lambda e: show_admin_dashboard()),
                 reservas_container
-            ])
+            ], expand=True)
         )
 
+    @medir("cancelar_reserva_admin")
     def handle_cancelar_reserva_admin(reserva):
         """Maneja la cancelación de una reserva por un administrador"""
-        success, message = cancelar_reserva_admin(reserva.id)
-        if success:
-            show_success(message)
-            show_gestion_reservas()  # Recargar la vista
-        else:
-            show_error(message)
+        def al_terminar(cancelada):
+            # La tarjeta se actualiza con el evento de la cancelación
+            if cancelada:
+                show_success("Reserva cancelada exitosamente")
+            else:
+                show_error("La reserva ya no está vigente")
+        
+        en_segundo_plano(lambda: gestor_salas.cancelar_reserva(reserva.id), al_terminar)
 
     def show_estadisticas():
-        page.clean()
+        nueva_vista()
         page.add(back_button())  # Agregar botón de retroceso
         
-        # Estadísticas básicas
-        total_reservas = len(gestor_salas.reservas)
-        reservas_activas = len([r for r in gestor_salas.reservas if r.estado != 'cancelada'])
-        salas_mas_utilizadas = {}
+        # Estadísticas básicas (contadores mantenidos por el gestor)
+        estadisticas = gestor_salas.estadisticas
+        nombres_salas = {s.id: s.nombre for s in gestor_salas.salas}
+        
+        # Uso de las salas en horario lectivo, 30 días antes y después de hoy
+        # (solo las reservas y ocurrencias de series de esa ventana)
+        hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        desde, hasta = hoy - timedelta(days=30), hoy + timedelta(days=30)
+        ocupacion = calcular_ocupacion_intervalos(gestor_salas.intervalos_ocupados(desde, hasta),
+                                                  nombres_salas, desde, hasta)
+        horario = (8, 22)
+        utilizacion = utilizacion_por_sala(ocupacion, horario)
+        ociosas = salas_ociosas(ocupacion, horas=horario)
         
-        for reserva in gestor_salas.reservas:
-            if reserva.estado != 'cancelada':
-                sala_id = reserva.sala_id
-                salas_mas_utilizadas[sala_id] = salas_mas_utilizadas.get(sala_id, 0) + 1
+        total_text = Text(f"Total de reservas: {estadisticas.total}")
+        activas_text = Text(f"Reservas activas: {estadisticas.activas}")
         
-        salas_ordenadas = sorted(salas_mas_utilizadas.items(), key=lambda x: x[1], reverse=True)
+        def al_cambiar(reserva, accion):
+            total_text.value = f"Total de reservas: {estadisticas.total}"
+            activas_text.value = f"Reservas activas: {estadisticas.activas}"
+            page.update(total_text, activas_text)
         
+        oyentes_vista.append(al_cambiar)
         page.add(
             Column([
                 title("Estadísticas"),
                 card(Column([
                     subtitle("Reservas"),
-                    Text(f"Total de reservas: {total_reservas}"),
-                    Text(f"Reservas activas: {reservas_activas}"),
+                    total_text,
+                    activas_text,
                     subtitle("Salas más utilizadas"),
-                    *[Text(f"{next(s for s in gestor_salas.salas if s.id == sala_id).nombre}: {count} reservas")
-                      for sala_id, count in salas_ordenadas[:3]]
+                    *[Text(f"{nombres_salas[sala_id]}: {count} reservas")
+                      for sala_id, count in estadisticas.top_salas(3)],
+                    subtitle("Usuarios con más reservas"),
+                    *[Text(f"{email}: {count} reservas")
+                      for email, count in estadisticas.top_usuarios(3)]
+                ])),
+                card(Column([
+                    subtitle("Uso de salas (últimos y próximos 30 días, 8:00 a 22:00)"),
+                    *[Text(f"{nombres_salas[sala_id]}: {uso:.1f}%")
+                      for sala_id, uso in sorted(utilizacion.items(), key=lambda x: x[1], reverse=True)],
+                    subtitle("Horas pico"),
+                    *[Text(f"{DIAS_SEMANA[dia]} {hora:02d}:00: {uso:.1f}%")
+                      for dia, hora, uso in horas_pico(ocupacion, 3)],
+                    subtitle("Salas sin uso"),
+                    Text(", ".join(nombres_salas[sala_id] for sala_id in ociosas) or "Ninguna")
                 ])),
                 primary_button("Volver", on_click=lambda e: show_admin_dashboard())
             ])
@@ -451,7 +722,7 @@ def main(page: Page):
         nonlocal usuario_actual, rol_actual
         usuario_actual = None
         rol_actual = None
-        page.clean()
+        nueva_vista()
         
         # Contenedor de login centrado
         login_card = card(
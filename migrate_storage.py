@@ -0,0 +1,11 @@
+from modules.storage import migrate_json_to_sqlite, SQLITE_FILE
+
+def migrate_storage():
+    """Migra los datos de data/*.json a la base SQLite"""
+    migrated = migrate_json_to_sqlite()
+    for collection, count in migrated.items():
+        print(f"{collection}: {count} registros migrados")
+    print(f"Datos migrados a {SQLITE_FILE}. Use STORAGE_BACKEND=sqlite para activarla")
+
+if __name__ == "__main__":
+    migrate_storage()
@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+from modules.salas import ESTADOS_ANULADOS, Reserva
+
+# Duración de cada franja de la matriz de ocupación
+SLOT_MINUTOS = 60
+
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+@dataclass
+class Ocupacion:
+    """Minutos ocupados por sala (filas) y franja (columnas) desde `desde`"""
+    salas_ids: np.ndarray
+    desde: datetime
+    slot_minutos: int
+    minutos: np.ndarray
+
+    @property
+    def inicios(self) -> np.ndarray:
+        """Inicio de cada franja como datetime64[m]"""
+        base = np.datetime64(self.desde, "m")
+        return base + np.arange(self.minutos.shape[1]) * np.timedelta64(self.slot_minutos, "m")
+
+def _minutos_desde(fechas: Iterable[datetime], base: datetime, cantidad: int) -> np.ndarray:
+    """Minutos de cada fecha respecto a `base` (mucho más rápido que convertir a datetime64)"""
+    dia = base.toordinal()
+    minutos = np.fromiter(((f.toordinal() - dia) * 1440 + f.hour * 60 + f.minute for f in fechas),
+                          dtype=np.int64, count=cantidad)
+    return minutos - (base.hour * 60 + base.minute)
+
+def calcular_ocupacion(
+    reservas: Iterable[Reserva],
+    salas_ids: Iterable[int],
+    desde: datetime,
+    hasta: datetime,
+    slot_minutos: int = SLOT_MINUTOS
+) -> Ocupacion:
+    """Construye la matriz salas × franjas con los minutos ocupados en cada franja.
+
+    Las reservas anuladas y las de salas fuera de `salas_ids` se ignoran, y
+    cada intervalo se recorta al rango. Todo el cálculo es vectorizado: cada
+    reserva suma un escalón en su franja de inicio y lo resta en la de fin
+    (arreglo de diferencias), y las fracciones de franja se corrigen aparte.
+    """
+    reservas = [r for r in reservas if r.estado not in ESTADOS_ANULADOS]
+    sala = np.fromiter((r.sala_id for r in reservas), dtype=np.int64, count=len(reservas))
+    inicio = _minutos_desde((r.fecha_inicio for r in reservas), desde, len(reservas))
+    fin = _minutos_desde((r.fecha_fin for r in reservas), desde, len(reservas))
+    return _ocupacion(sala, inicio, fin, salas_ids, desde, hasta, slot_minutos)
+
+def calcular_ocupacion_intervalos(
+    intervalos: Iterable[Tuple[int, datetime, datetime]],
+    salas_ids: Iterable[int],
+    desde: datetime,
+    hasta: datetime,
+    slot_minutos: int = SLOT_MINUTOS
+) -> Ocupacion:
+    """Igual que calcular_ocupacion, a partir de intervalos ocupados (sala_id, inicio, fin).
+
+    Pensada para GestorSalas.intervalos_ocupados, que entrega solo los de la
+    ventana consultada en lugar de todo el historial de reservas.
+    """
+    intervalos = list(intervalos)
+    sala = np.fromiter((i[0] for i in intervalos), dtype=np.int64, count=len(intervalos))
+    inicio = _minutos_desde((i[1] for i in intervalos), desde, len(intervalos))
+    fin = _minutos_desde((i[2] for i in intervalos), desde, len(intervalos))
+    return _ocupacion(sala, inicio, fin, salas_ids, desde, hasta, slot_minutos)
+
+def _ocupacion(sala, inicio, fin, salas_ids, desde, hasta, slot_minutos) -> Ocupacion:
+    """Matriz de ocupación a partir de los arreglos de sala, inicio y fin (minutos desde `desde`)"""
+    salas_ids = np.unique(np.fromiter(salas_ids, dtype=np.int64))
+    total = int((hasta - desde).total_seconds() // 60)
+    franjas = -(-total // slot_minutos)
+
+    # Recortar al rango y descartar salas desconocidas o intervalos vacíos
+    inicio = np.clip(inicio, 0, total)
+    fin = np.clip(fin, 0, total)
+    fila = np.searchsorted(salas_ids, sala)
+    validas = (fin > inicio) & (fila < len(salas_ids))
+    validas[validas] &= salas_ids[fila[validas]] == sala[validas]
+    fila, inicio, fin = fila[validas], inicio[validas], fin[validas]
+
+    franja_inicio, resto_inicio = np.divmod(inicio, slot_minutos)
+    franja_fin, resto_fin = np.divmod(fin, slot_minutos)
+    escalones = np.zeros((len(salas_ids), franjas + 1), dtype=np.int64)
+    np.add.at(escalones, (fila, franja_inicio), 1)
+    np.add.at(escalones, (fila, franja_fin), -1)
+    minutos = np.cumsum(escalones, axis=1) * slot_minutos
+    np.add.at(minutos, (fila, franja_inicio), -resto_inicio)
+    np.add.at(minutos, (fila, franja_fin), resto_fin)
+    return Ocupacion(salas_ids, desde, slot_minutos, minutos[:, :franjas])
+
+def _mascara_horario(ocupacion: Ocupacion, horas: Optional[Tuple[int, int]]) -> np.ndarray:
+    """Franjas cuya hora de inicio cae en [horas[0], horas[1])"""
+    if horas is None:
+        return np.ones(ocupacion.minutos.shape[1], dtype=bool)
+    hora = (ocupacion.inicios.astype(np.int64) // 60) % 24
+    return (hora >= horas[0]) & (hora < horas[1])
+
+def utilizacion_por_sala(ocupacion: Ocupacion, horas: Optional[Tuple[int, int]] = None) -> dict:
+    """Porcentaje de uso de cada sala en el rango (opcionalmente solo entre ciertas horas)"""
+    mascara = _mascara_horario(ocupacion, horas)
+    disponibles = mascara.sum() * ocupacion.slot_minutos
+    if not disponibles:
+        return {int(s): 0.0 for s in ocupacion.salas_ids}
+    usados = ocupacion.minutos[:, mascara].sum(axis=1)
+    return dict(zip(ocupacion.salas_ids.tolist(), (100.0 * usados / disponibles).tolist()))
+
+def mapa_calor(ocupacion: Ocupacion) -> np.ndarray:
+    """Porcentaje de uso por día de la semana (filas, lunes = 0) y hora (columnas)"""
+    minutos = ocupacion.inicios.astype(np.int64)
+    dia = (minutos // (24 * 60) + 3) % 7  # 1970-01-01 fue jueves
+    hora = (minutos // 60) % 24
+    usados = np.zeros((7, 24))
+    disponibles = np.zeros((7, 24))
+    np.add.at(usados, (dia, hora), ocupacion.minutos.sum(axis=0))
+    np.add.at(disponibles, (dia, hora), ocupacion.slot_minutos * len(ocupacion.salas_ids))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nan_to_num(100.0 * usados / disponibles)
+
+def horas_pico(ocupacion: Ocupacion, k: int = 3) -> List[Tuple[int, int, float]]:
+    """Las k combinaciones (día de la semana, hora) con mayor uso, como (día, hora, porcentaje)"""
+    calor = mapa_calor(ocupacion)
+    mejores = np.argsort(calor, axis=None)[::-1][:k]
+    return [(int(d), int(h), float(calor[d, h]))
+            for d, h in zip(*np.unravel_index(mejores, calor.shape)) if calor[d, h] > 0]
+
+def salas_ociosas(ocupacion: Ocupacion, umbral: float = 0.0, horas: Optional[Tuple[int, int]] = None) -> List[int]:
+    """Salas cuyo porcentaje de uso no supera `umbral`"""
+    return [sala_id for sala_id, uso in utilizacion_por_sala(ocupacion, horas).items() if uso <= umbral]
\ No newline at end of file
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import List
 from datetime import datetime
+import threading
 
 @dataclass
 class Tutorial:
@@ -48,9 +49,7 @@ class GestorCapacitacion:
         return (completados / total) * 100 if total > 0 else 0
 
     def marcar_completado(self, usuario_email: str, tutorial_id: int) -> bool:
-        if usuario_email not in self.tutoriales_completados:
-            self.tutoriales_completados[usuario_email] = set()
-        self.tutoriales_completados[usuario_email].add(tutorial_id)
+        self.tutoriales_completados.setdefault(usuario_email, set()).add(tutorial_id)
         return True
 
     def obtener_progreso_usuario(self, usuario_email: str) -> ProgresoUsuario:
@@ -95,4 +94,17 @@ class GestorCapacitacion:
             )
         
         self.progreso_usuarios[usuario_email].ultimo_acceso = datetime.now()
-        return True 
\ No newline at end of file
+        return True 
+
+# Gestor compartido por todas las sesiones del proceso
+_gestor_capacitacion = None
+_gestor_capacitacion_lock = threading.Lock()
+
+def obtener_gestor_capacitacion() -> GestorCapacitacion:
+    """Devuelve el gestor de capacitación único del proceso (lo crea la primera vez)"""
+    global _gestor_capacitacion
+    if _gestor_capacitacion is None:
+        with _gestor_capacitacion_lock:
+            if _gestor_capacitacion is None:
+                _gestor_capacitacion = GestorCapacitacion()
+    return _gestor_capacitacion
\ No newline at end of file
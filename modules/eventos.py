@@ -0,0 +1,62 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+# Temas publicados en el bus
+TEMAS = ("reservas", "salas", "usuarios")
+
+@dataclass
+class Evento:
+    tema: str    # 'reservas', 'salas', 'usuarios'
+    accion: str  # 'alta', 'cambio', 'baja'
+    datos: Any   # el objeto después del cambio (o su ID, desde los módulos de almacenamiento)
+    anterior: Any = None  # p. ej. el estado anterior de una reserva
+
+class BusEventos:
+    """Publicación y suscripción en el proceso para los cambios de reservas, salas y usuarios.
+
+    Los suscriptores (típicamente una sesión de Flet) se llaman en el hilo que
+    publica, fuera del candado, y sus errores no afectan a los demás.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._suscriptores: Dict[str, List] = {tema: [] for tema in TEMAS}
+
+    def suscribir(self, tema: str, callback):
+        """Registra `callback(evento)` para los eventos de `tema`"""
+        with self._lock:
+            # Copia al escribir: publicar recorre la lista sin tomar el candado
+            self._suscriptores[tema] = self._suscriptores[tema] + [callback]
+
+    def desuscribir(self, tema: str, callback) -> bool:
+        with self._lock:
+            suscriptores = self._suscriptores[tema]
+            if callback not in suscriptores:
+                return False
+            self._suscriptores[tema] = [s for s in suscriptores if s is not callback]
+            return True
+
+    def publicar(self, tema: str, accion: str, datos: Any, anterior: Any = None):
+        evento = Evento(tema, accion, datos, anterior)
+        for callback in self._suscriptores[tema]:
+            try:
+                callback(evento)
+            except Exception as e:
+                print(f"Error en suscriptor de {tema}: {str(e)}")
+
+    def cantidad_suscriptores(self, tema: str) -> int:
+        return len(self._suscriptores[tema])
+
+# Bus compartido por todas las sesiones del proceso
+_bus = None
+_bus_lock = threading.Lock()
+
+def obtener_bus_eventos() -> BusEventos:
+    """Devuelve el bus de eventos único del proceso (lo crea la primera vez)"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = BusEventos()
+    return _bus
\ No newline at end of file
@@ -0,0 +1,115 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from modules.qr_payload import decode_compact, is_compact
+
+# Registro de reservas canceladas (una por línea) que leen los kioscos
+REVOCATIONS_FILE = "data/revocations.log"
+
+# Registro aparte para las reservas del gestor en memoria (GestorSalas), cuyos
+# IDs se numeran independientemente de los del almacenamiento y vuelven a
+# empezar en cada ejecución (el gestor lo vacía al crearse)
+SALAS_REVOCATIONS_FILE = "data/revocations_salas.log"
+
+# Minutos antes del inicio en que ya se acepta el ingreso
+KIOSK_EARLY_MINUTES = 10
+
+# Segundos entre sincronizaciones de las cancelaciones
+KIOSK_SYNC_INTERVAL = 5
+
+_revocations_lock = threading.Lock()
+
+def publish_revocation(reservation_id, revocations_file=None):
+    """Agrega una reserva cancelada o liberada al registro que sincronizan los kioscos"""
+    path = revocations_file or REVOCATIONS_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _revocations_lock, open(path, "a") as f:
+        f.write(f"{reservation_id}\n")
+
+def clear_revocations(revocations_file=None):
+    """Vacía un registro de revocaciones; los kioscos lo notan y vuelven a leerlo desde el inicio"""
+    path = revocations_file or REVOCATIONS_FILE
+    with _revocations_lock:
+        if os.path.exists(path):
+            open(path, "w").close()
+
+class KioskValidator:
+    """Valida en la puerta del salón códigos QR compactos firmados.
+
+    La validación solo verifica la firma, la ventana horaria y un conjunto de
+    reservas revocadas en memoria; nunca lee reservas ni salones. Las
+    cancelaciones se incorporan leyendo solo las líneas nuevas del registro de
+    revocaciones, idealmente desde el hilo de `start`. Si se indica
+    `on_check_in`, se llama con el id de cada reserva validada para registrar
+    el ingreso (p. ej. `GestorSalas.registrar_checkin`).
+    """
+
+    def __init__(self, room_id=None, secret=None, early_minutes=KIOSK_EARLY_MINUTES,
+                 revocations_file=None, on_check_in=None):
+        self.room_id = int(room_id) if room_id is not None else None
+        self.secret = secret
+        self.early = timedelta(minutes=early_minutes)
+        self.revocations_file = revocations_file or REVOCATIONS_FILE
+        self.on_check_in = on_check_in
+        self.revoked = set()
+        self._offset = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sync(self):
+        """Incorpora las cancelaciones nuevas del registro; devuelve cuántas se leyeron"""
+        try:
+            with open(self.revocations_file, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < self._offset:
+                    # El registro se recreó: volver a leerlo completo
+                    self._offset = 0
+                    self.revoked = set()
+                f.seek(self._offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return 0
+        # Una última línea sin salto todavía se está escribiendo
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        self._offset += len(complete)
+        new_ids = {int(line) for line in complete.split() if line.isdigit()}
+        self.revoked |= new_ids
+        return len(new_ids)
+
+    def start(self, interval=KIOSK_SYNC_INTERVAL):
+        """Sincroniza las cancelaciones en segundo plano cada `interval` segundos"""
+        self.sync()
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.sync()
+                except OSError as e:
+                    print(f"Error al sincronizar revocaciones: {str(e)}")
+
+        self._thread = threading.Thread(target=run, name="kiosk-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def validate(self, qr_data, now=None):
+        """Valida un código QR; devuelve (True, datos) o (False, mensaje)"""
+        if not is_compact(qr_data):
+            return False, "Formato de código QR no soportado en el kiosco"
+        payload = decode_compact(qr_data, self.secret)
+        if payload is None:
+            return False, "Código QR inválido"
+        if self.room_id is not None and payload["room_id"] != self.room_id:
+            return False, "La reserva corresponde a otro salón"
+        if payload["reservation_id"] in self.revoked:
+            return False, "La reserva fue cancelada o liberada"
+        now = now or datetime.now()
+        if now < payload["start_time"] - self.early:
+            return False, "La reserva aún no ha comenzado"
+        if now > payload["end_time"]:
+            return False, "La reserva ya ha finalizado"
+        if self.on_check_in is not None:
+            self.on_check_in(payload["reservation_id"])
+        return True, payload
\ No newline at end of file
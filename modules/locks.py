@@ -0,0 +1,80 @@
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class StripedLock:
+    """Conjunto fijo de candados repartidos por hash de la clave.
+
+    Operaciones sobre claves distintas suelen caer en candados distintos y
+    avanzan en paralelo; operaciones sobre la misma clave se serializan.
+    """
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def for_key(self, key):
+        """Candado que corresponde a una clave"""
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def hold(self, keys):
+        """Toma los candados de varias claves, siempre en el mismo orden para evitar interbloqueos"""
+        indexes = sorted({hash(key) % len(self._locks) for key in keys})
+        for index in indexes:
+            self._locks[index].acquire()
+        try:
+            yield
+        finally:
+            for index in reversed(indexes):
+                self._locks[index].release()
+
+class FileLock:
+    """Candado exclusivo entre procesos sobre un archivo .lock.
+
+    Es reentrante dentro del proceso: los hilos se serializan con un RLock y
+    solo el primer nivel toma el bloqueo del sistema operativo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            if self._depth == 0:
+                if os.path.dirname(self.path):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a+b")
+                if fcntl:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+            self._depth += 1
+        except:
+            self._lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._depth -= 1
+            if self._depth == 0:
+                if fcntl:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+                self._file.close()
+                self._file = None
+        finally:
+            self._lock.release()
@@ -0,0 +1,84 @@
+import heapq
+import threading
+from datetime import datetime
+from itertools import count
+
+class Planificador:
+    """Ejecuta acciones a una hora dada desde un único hilo.
+
+    Las acciones pendientes se guardan en un heap ordenado por vencimiento:
+    programar cuesta O(log n) y el hilo duerme hasta el próximo vencimiento
+    (o hasta que se programa uno más temprano), sin recorrer las pendientes.
+    Las acciones deben ser cortas; las que quedaron obsoletas (p. ej. de una
+    reserva cancelada) simplemente no hacen nada al ejecutarse.
+    """
+
+    def __init__(self, reloj=datetime.now):
+        self.reloj = reloj
+        self._heap = []
+        self._secuencia = count()
+        self._condicion = threading.Condition()
+        self._detenido = False
+        self._hilo = None
+
+    def programar(self, instante: datetime, accion, *args):
+        """Agenda `accion(*args)` para `instante`"""
+        with self._condicion:
+            heapq.heappush(self._heap, (instante, next(self._secuencia), accion, args))
+            # Despertar al hilo solo si cambió el próximo vencimiento
+            if self._heap[0][0] == instante:
+                self._condicion.notify()
+
+    def ejecutar_vencidos(self, ahora: datetime = None) -> int:
+        """Ejecuta en el hilo actual las acciones vencidas; devuelve cuántas corrió"""
+        ahora = ahora or self.reloj()
+        ejecutadas = 0
+        while True:
+            with self._condicion:
+                if not self._heap or self._heap[0][0] > ahora:
+                    return ejecutadas
+                _, _, accion, args = heapq.heappop(self._heap)
+            self._correr(accion, args)
+            ejecutadas += 1
+
+    def iniciar(self):
+        """Arranca el hilo que ejecuta las acciones a medida que vencen"""
+        with self._condicion:
+            if self._hilo is not None:
+                return
+            self._detenido = False
+            self._hilo = threading.Thread(target=self._bucle, name="planificador", daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        with self._condicion:
+            self._detenido = True
+            self._condicion.notify()
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None and hilo is not threading.current_thread():
+            hilo.join()
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                while not self._detenido:
+                    if not self._heap:
+                        self._condicion.wait()
+                        continue
+                    espera = (self._heap[0][0] - self.reloj()).total_seconds()
+                    if espera <= 0:
+                        break
+                    self._condicion.wait(espera)
+                if self._detenido:
+                    return
+                _, _, accion, args = heapq.heappop(self._heap)
+            self._correr(accion, args)
+
+    def _correr(self, accion, args):
+        try:
+            accion(*args)
+        except Exception as e:
+            print(f"Error en acción programada: {str(e)}")
+
+    def __len__(self) -> int:
+        return len(self._heap)
\ No newline at end of file
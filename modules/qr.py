@@ -1,16 +1,71 @@
 import qrcode
 from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+import base64
+import hashlib
 import io
 import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import os
-from modules.reservations import get_reservation
-from modules.rooms import get_room
+from typing import Optional, Tuple
+from modules.reservations import check_in_reservation, check_in_reservations, get_reservation, load_reservations
+from modules.rooms import get_room, load_rooms
+from modules.qr_payload import SCOPE_SALAS, decode_compact, encode_compact, get_secret, is_compact
 
 # Directorio para almacenar los códigos QR
 QR_DIR = "data/qr_codes"
 
+# Cantidad de códigos QR renderizados que se guardan en memoria
+QR_CACHE_SIZE = 256
+
+# Lado máximo (en píxeles) al que se reducen las imágenes antes de decodificarlas
+SCAN_MAX_SIZE = 1000
+SCAN_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+class QRCache:
+    """Caché LRU de códigos QR renderizados (PNG y base64), indexada por el hash del contenido"""
+
+    def __init__(self, max_size: int = QR_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def put(self, key: str, png: bytes, png_base64: str):
+        with self._lock:
+            self._items[key] = (png, png_base64)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._items), "hits": self.hits, "misses": self.misses}
+
 class QRManager:
+    cache = QRCache()
+
     @staticmethod
     def generar_qr(
         reserva_id: int,
@@ -19,15 +74,49 @@ class QRManager:
         fecha_inicio: datetime,
         fecha_fin: datetime
     ) -> bytes:
+        entrada = QRManager._generar(reserva_id, sala_id, usuario_email, fecha_inicio, fecha_fin)
+        return entrada[0] if entrada else None
+
+    @staticmethod
+    def generar_qr_base64(
+        reserva_id: int,
+        sala_id: int,
+        usuario_email: str,
+        fecha_inicio: datetime,
+        fecha_fin: datetime
+    ) -> str:
+        """Igual que generar_qr pero devuelve el PNG codificado en base64 (para mostrarlo en Flet)"""
+        entrada = QRManager._generar(reserva_id, sala_id, usuario_email, fecha_inicio, fecha_fin)
+        return entrada[1] if entrada else None
+
+    @staticmethod
+    def _generar(
+        reserva_id: int,
+        sala_id: int,
+        usuario_email: str,
+        fecha_inicio: datetime,
+        fecha_fin: datetime
+    ) -> Optional[Tuple[bytes, str]]:
         try:
-            # Crear el contenido del QR
-            contenido = {
-                "reserva_id": reserva_id,
-                "sala_id": sala_id,
-                "usuario_email": usuario_email,
-                "fecha_inicio": fecha_inicio.isoformat(),
-                "fecha_fin": fecha_fin.isoformat()
-            }
+            # Crear el contenido del QR (compacto y firmado con la clave de GestorSalas;
+            # JSON si los IDs no son numéricos)
+            try:
+                contenido = encode_compact(reserva_id, sala_id, fecha_inicio, fecha_fin,
+                                           get_secret(SCOPE_SALAS))
+            except ValueError:
+                contenido = json.dumps({
+                    "reserva_id": reserva_id,
+                    "sala_id": sala_id,
+                    "usuario_email": usuario_email,
+                    "fecha_inicio": fecha_inicio.isoformat(),
+                    "fecha_fin": fecha_fin.isoformat()
+                })
+
+            # Reutilizar la imagen si ya se generó para el mismo contenido
+            clave = hashlib.sha256(contenido.encode()).hexdigest()
+            entrada = QRManager.cache.get(clave)
+            if entrada:
+                return entrada
 
             # Generar el código QR
             qr = qrcode.QRCode(
@@ -36,7 +125,7 @@ class QRManager:
                 box_size=10,
                 border=4,
             )
-            qr.add_data(json.dumps(contenido))
+            qr.add_data(contenido)
             qr.make(fit=True)
 
             # Crear la imagen
@@ -47,7 +136,9 @@ class QRManager:
             img.save(img_byte_arr, format='PNG')
             img_byte_arr = img_byte_arr.getvalue()
             
-            return img_byte_arr
+            entrada = (img_byte_arr, base64.b64encode(img_byte_arr).decode())
+            QRManager.cache.put(clave, *entrada)
+            return entrada
         except Exception as e:
             print(f"Error al generar QR: {str(e)}")
             return None
@@ -58,12 +149,24 @@ class QRManager:
         Valida y decodifica la información del código QR.
         
         Args:
-            qr_data: Datos del código QR en formato JSON
+            qr_data: Datos del código QR en formato compacto o JSON
             
         Returns:
-            dict: Información decodificada o None si es inválida
+            dict: Información decodificada o None si es inválida. El formato
+            compacto no incluye el email del usuario (queda en None).
         """
         try:
+            if is_compact(qr_data):
+                payload = decode_compact(qr_data, get_secret(SCOPE_SALAS))
+                if payload is None:
+                    return None
+                return {
+                    "reserva_id": payload["reservation_id"],
+                    "sala_id": payload["room_id"],
+                    "usuario_email": None,
+                    "fecha_inicio": payload["start_time"],
+                    "fecha_fin": payload["end_time"]
+                }
             data = json.loads(qr_data)
             # Verificar que todos los campos necesarios estén presentes
             required_fields = ["reserva_id", "sala_id", "usuario_email", 
@@ -78,6 +181,57 @@ class QRManager:
             print(f"Error al validar QR: {str(e)}")
             return None
 
+def _reservation_qr_content(reservation_id, reservation, room):
+    """Contenido del código QR de una reserva (compacto y firmado; JSON si los IDs no son numéricos)"""
+    try:
+        return encode_compact(
+            reservation_id,
+            reservation["room_id"],
+            datetime.fromisoformat(reservation["start_time"]),
+            datetime.fromisoformat(reservation["end_time"])
+        )
+    except ValueError:
+        pass
+    return json.dumps({
+        "reservation_id": reservation_id,
+        "room_id": reservation["room_id"],
+        "room_name": room["name"],
+        "start_time": reservation["start_time"],
+        "end_time": reservation["end_time"],
+        "purpose": reservation["purpose"]
+    })
+
+def _qr_filename(reservation_id):
+    return f"{QR_DIR}/reservation_{reservation_id}.png"
+
+def _qr_file_digest(filename):
+    """Hash del contenido guardado en un PNG generado, o None si no existe"""
+    try:
+        with Image.open(filename) as img:
+            return img.text.get("content_sha256")
+    except (OSError, AttributeError):
+        return None
+
+def _render_qr_file(content, filename):
+    """Genera la imagen de un código QR y la guarda con el hash de su contenido"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(content)
+    qr.make(fit=True)
+    
+    # Crear la imagen
+    img = qr.make_image(fill_color="black", back_color="white")
+    
+    # Guardar la imagen (el hash permite saber luego si está al día)
+    info = PngInfo()
+    info.add_text("content_sha256", hashlib.sha256(content.encode()).hexdigest())
+    img.save(filename, pnginfo=info)
+    return filename
+
 def generate_qr_code(reservation_id):
     """Genera un código QR para una reserva"""
     try:
@@ -94,37 +248,66 @@ def generate_qr_code(reservation_id):
         # Crear directorio si no existe
         os.makedirs(QR_DIR, exist_ok=True)
         
-        # Crear el contenido del QR
-        qr_content = {
-            "reservation_id": reservation_id,
-            "room_id": reservation["room_id"],
-            "room_name": room["name"],
-            "start_time": reservation["start_time"],
-            "end_time": reservation["end_time"],
-            "purpose": reservation["purpose"]
-        }
-        
-        # Generar el código QR
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(json.dumps(qr_content))
-        qr.make(fit=True)
-        
-        # Crear la imagen
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Guardar la imagen
-        filename = f"{QR_DIR}/reservation_{reservation_id}.png"
-        img.save(filename)
-        
-        return True, filename
+        content = _reservation_qr_content(reservation_id, reservation, room)
+        return True, _render_qr_file(content, _qr_filename(reservation_id))
     except Exception as e:
         return False, f"Error al generar código QR: {str(e)}"
 
+def generate_qr_codes(reservation_ids=None, max_workers=None, force=False):
+    """Genera en paralelo los códigos QR de varias reservas.
+
+    Carga reservas y salones una sola vez y reparte el renderizado entre
+    procesos. Omite las imágenes que ya están al día (mismo contenido) salvo que
+    se indique `force`. Sin IDs se generan todas las reservas no canceladas.
+    """
+    started = time.perf_counter()
+    reservations = load_reservations()
+    rooms = load_rooms()
+    if reservation_ids is None:
+        reservation_ids = [rid for rid, res in reservations.items() if res.get("status") != "cancelled"]
+    
+    results = {}
+    jobs = {}
+    skipped = 0
+    for reservation_id in reservation_ids:
+        reservation = reservations.get(reservation_id)
+        if not reservation:
+            results[reservation_id] = (False, "Reserva no encontrada")
+            continue
+        room = rooms.get(reservation["room_id"])
+        if not room:
+            results[reservation_id] = (False, "Salón no encontrado")
+            continue
+        content = _reservation_qr_content(reservation_id, reservation, room)
+        filename = _qr_filename(reservation_id)
+        if not force and _qr_file_digest(filename) == hashlib.sha256(content.encode()).hexdigest():
+            results[reservation_id] = (True, filename)
+            skipped += 1
+            continue
+        jobs[reservation_id] = (content, filename)
+    
+    if jobs:
+        os.makedirs(QR_DIR, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_render_qr_file, content, filename): reservation_id
+                       for reservation_id, (content, filename) in jobs.items()}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = (True, future.result())
+                except Exception as e:
+                    results[futures[future]] = (False, f"Error al generar código QR: {str(e)}")
+    
+    elapsed = time.perf_counter() - started
+    generated = sum(1 for rid in jobs if results[rid][0])
+    return {
+        "results": results,
+        "generated": generated,
+        "skipped": skipped,
+        "failed": sum(1 for ok, _ in results.values() if not ok),
+        "seconds": elapsed,
+        "per_second": generated / elapsed if elapsed > 0 else 0.0
+    }
+
 def scan_qr_code(image_path):
     """Escanea un código QR desde una imagen"""
     try:
@@ -142,39 +325,144 @@ def scan_qr_code(image_path):
         if not decoded:
             return False, "No se pudo decodificar el código QR"
         
-        # Obtener el contenido del QR
-        qr_content = json.loads(decoded[0].data.decode())
-        
-        # Verificar si la reserva existe
-        reservation = get_reservation(qr_content["reservation_id"])
-        if not reservation:
-            return False, "Reserva no encontrada"
-        
-        # Verificar si el salón existe
-        room = get_room(qr_content["room_id"])
-        if not room:
-            return False, "Salón no encontrado"
-        
-        # Verificar si la reserva está activa
-        current_time = datetime.now()
-        start_time = datetime.fromisoformat(reservation["start_time"])
-        end_time = datetime.fromisoformat(reservation["end_time"])
-        
-        if current_time < start_time:
-            return False, "La reserva aún no ha comenzado"
-        elif current_time > end_time:
-            return False, "La reserva ya ha finalizado"
-        
-        return True, {
-            "reservation": reservation,
-            "room": room
-        }
+        # Obtener el contenido del QR y registrar el ingreso si es válido
+        valid, result = _validate_scanned(decoded[0].data.decode(), get_reservation, get_room, datetime.now())
+        if valid:
+            check_in_reservation(result["reservation_id"])
+        return valid, result
         
     except ImportError:
         return False, "Módulo pyzbar no instalado. Ejecute: pip install pyzbar"
     except Exception as e:
         return False, f"Error al escanear el código QR: {str(e)}"
 
+def _validate_scanned(data, find_reservation, find_room, current_time):
+    """Valida el contenido leído de un código QR contra las reservas y salones"""
+    if is_compact(data):
+        payload = decode_compact(data)
+        if payload is None:
+            return False, "Código QR inválido"
+        qr_content = {
+            "reservation_id": str(payload["reservation_id"]),
+            "room_id": str(payload["room_id"])
+        }
+    else:
+        qr_content = json.loads(data)
+    
+    # Verificar si la reserva existe
+    reservation = find_reservation(qr_content["reservation_id"])
+    if not reservation:
+        return False, "Reserva no encontrada"
+    
+    # Verificar que el código sea del salón de la reserva
+    if str(qr_content["room_id"]) != str(reservation["room_id"]):
+        return False, "La reserva corresponde a otro salón"
+    
+    # Verificar si el salón existe
+    room = find_room(qr_content["room_id"])
+    if not room:
+        return False, "Salón no encontrado"
+    
+    # Verificar si la reserva está activa
+    start_time = datetime.fromisoformat(reservation["start_time"])
+    end_time = datetime.fromisoformat(reservation["end_time"])
+    
+    if current_time < start_time:
+        return False, "La reserva aún no ha comenzado"
+    elif current_time > end_time:
+        return False, "La reserva ya ha finalizado"
+    
+    return True, {
+        "reservation_id": qr_content["reservation_id"],
+        "reservation": reservation,
+        "room": room
+    }
+
+def _decode_image(image_path, max_size, roi):
+    """Preprocesa y decodifica una imagen; se ejecuta en un proceso del pool"""
+    from pyzbar.pyzbar import decode
+    
+    started = time.perf_counter()
+    with Image.open(image_path) as img:
+        # Escala de grises, recorte opcional y reducción de tamaño
+        img = img.convert("L")
+        if roi:
+            img = img.crop(roi)
+        if max_size:
+            img.thumbnail((max_size, max_size))
+    preprocessed = time.perf_counter()
+    decoded = [symbol.data.decode() for symbol in decode(img)]
+    return decoded, preprocessed - started, time.perf_counter() - preprocessed
+
+def scan_qr_images(image_paths, max_workers=None, max_size=SCAN_MAX_SIZE, roi=None):
+    """Escanea varios códigos QR en paralelo.
+
+    Cada imagen se pasa a escala de grises, se recorta a `roi` (izquierda,
+    arriba, derecha, abajo) si se indica y se reduce a `max_size` antes de
+    decodificarla en un proceso del pool. Los IDs leídos se validan contra un
+    único índice en memoria de reservas y salones, y el ingreso de las reservas
+    válidas se registra en una sola escritura. Devuelve el resultado por
+    imagen y el tiempo de cada etapa (preprocesamiento y decodificación suman
+    el tiempo de todos los procesos).
+    """
+    started = time.perf_counter()
+    timings = {"preprocess": 0.0, "decode": 0.0, "validate": 0.0}
+    results = {}
+    decoded = {}
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_decode_image, path, max_size, roi): path
+                   for path in image_paths if os.path.exists(path)}
+        for path in image_paths:
+            if not os.path.exists(path):
+                results[path] = (False, "Imagen no encontrada")
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                data, preprocess_time, decode_time = future.result()
+            except ImportError:
+                results[path] = (False, "Módulo pyzbar no instalado. Ejecute: pip install pyzbar")
+                continue
+            except Exception as e:
+                results[path] = (False, f"Error al escanear el código QR: {str(e)}")
+                continue
+            timings["preprocess"] += preprocess_time
+            timings["decode"] += decode_time
+            if data:
+                decoded[path] = data[0]
+            else:
+                results[path] = (False, "No se pudo decodificar el código QR")
+    
+    # Validar todo contra un único índice en memoria
+    validate_started = time.perf_counter()
+    if decoded:
+        reservations = load_reservations()
+        rooms = load_rooms()
+        current_time = datetime.now()
+        valid_ids = []
+        for path, data in decoded.items():
+            try:
+                results[path] = _validate_scanned(data, reservations.get, rooms.get, current_time)
+            except Exception as e:
+                results[path] = (False, f"Error al escanear el código QR: {str(e)}")
+                continue
+            if results[path][0]:
+                valid_ids.append(results[path][1]["reservation_id"])
+        if valid_ids:
+            check_in_reservations(list(dict.fromkeys(valid_ids)), current_time)
+    timings["validate"] = time.perf_counter() - validate_started
+    timings["total"] = time.perf_counter() - started
+    
+    return {"results": results, "timings": timings, "images": len(image_paths)}
+
+def scan_qr_directory(directory, max_workers=None, max_size=SCAN_MAX_SIZE, roi=None):
+    """Escanea todas las imágenes de un directorio (ver scan_qr_images)"""
+    image_paths = sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(SCAN_EXTENSIONS)
+    )
+    return scan_qr_images(image_paths, max_workers=max_workers, max_size=max_size, roi=roi)
+
 def delete_qr_code(reservation_id):
     """Elimina el código QR de una reserva"""
     try:
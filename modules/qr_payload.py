@@ -0,0 +1,141 @@
+import calendar
+import hashlib
+import hmac
+import os
+import secrets
+import struct
+import threading
+from datetime import datetime, timedelta
+
+# Formato compacto: "SR1:" + base45(id reserva, id salón, inicio y fin en
+# minutos desde epoch, HMAC-SHA256 truncado). Solo usa caracteres del modo
+# alfanumérico de QR, así que cabe en un código de versión 2.
+COMPACT_PREFIX = "SR1:"
+HMAC_SIZE = 8
+_BODY = struct.Struct(">IIII")
+
+# Clave para firmar los códigos (variable de entorno o archivo generado)
+QR_SECRET_FILE = "data/qr_secret.key"
+
+BASE45_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+_BASE45_VALUES = {c: i for i, c in enumerate(BASE45_CHARSET)}
+
+# Ámbito de los códigos de las reservas del gestor en memoria (GestorSalas).
+# Firma con una clave derivada propia: sus IDs se numeran aparte de los del
+# almacenamiento y vuelven a empezar en cada ejecución, así que el ámbito lleva
+# un valor aleatorio por proceso y un código de otra ejecución no vale.
+SCOPE_SALAS = f"salas:{secrets.token_hex(8)}"
+
+_EPOCH = datetime(1970, 1, 1)
+_secret = None
+_scoped_secrets = {}
+_secret_lock = threading.Lock()
+
+def base45_encode(data: bytes) -> str:
+    """Codifica bytes en base45 (RFC 9285)"""
+    chars = []
+    for i in range(0, len(data) - 1, 2):
+        n = data[i] * 256 + data[i + 1]
+        n, c = divmod(n, 45)
+        e, d = divmod(n, 45)
+        chars += [BASE45_CHARSET[c], BASE45_CHARSET[d], BASE45_CHARSET[e]]
+    if len(data) % 2:
+        d, c = divmod(data[-1], 45)
+        chars += [BASE45_CHARSET[c], BASE45_CHARSET[d]]
+    return "".join(chars)
+
+def base45_decode(text: str) -> bytes:
+    """Decodifica texto base45 (RFC 9285); lanza ValueError si es inválido"""
+    try:
+        values = [_BASE45_VALUES[c] for c in text]
+    except KeyError:
+        raise ValueError("Carácter inválido en base45")
+    if len(values) % 3 == 1:
+        raise ValueError("Longitud inválida en base45")
+    out = bytearray()
+    for i in range(0, len(values), 3):
+        chunk = values[i:i + 3]
+        if len(chunk) == 3:
+            n = chunk[0] + chunk[1] * 45 + chunk[2] * 45 * 45
+            if n > 0xFFFF:
+                raise ValueError("Valor fuera de rango en base45")
+            out += bytes(divmod(n, 256))
+        else:
+            n = chunk[0] + chunk[1] * 45
+            if n > 0xFF:
+                raise ValueError("Valor fuera de rango en base45")
+            out.append(n)
+    return bytes(out)
+
+def get_secret(scope: str = None) -> bytes:
+    """Clave HMAC: QR_SECRET del entorno o data/qr_secret.key (se crea si no existe).
+
+    Con `scope` devuelve una clave derivada de la principal para ese ámbito.
+    """
+    global _secret
+    if scope is not None:
+        derived = _scoped_secrets.get(scope)
+        if derived is None:
+            derived = _scoped_secrets.setdefault(
+                scope, hmac.new(get_secret(), scope.encode(), hashlib.sha256).digest())
+        return derived
+    if _secret is None:
+        with _secret_lock:
+            if _secret is None:
+                if os.environ.get("QR_SECRET"):
+                    _secret = os.environ["QR_SECRET"].encode()
+                elif os.path.exists(QR_SECRET_FILE):
+                    with open(QR_SECRET_FILE, "rb") as f:
+                        _secret = f.read()
+                else:
+                    os.makedirs(os.path.dirname(QR_SECRET_FILE), exist_ok=True)
+                    _secret = secrets.token_bytes(32)
+                    with open(QR_SECRET_FILE, "wb") as f:
+                        f.write(_secret)
+    return _secret
+
+def _to_minutes(value: datetime) -> int:
+    return calendar.timegm(value.timetuple()) // 60
+
+def _from_minutes(minutes: int) -> datetime:
+    return _EPOCH + timedelta(minutes=minutes)
+
+def _signature(body: bytes, secret: bytes) -> bytes:
+    return hmac.new(secret, body, hashlib.sha256).digest()[:HMAC_SIZE]
+
+def is_compact(text: str) -> bool:
+    """Indica si el contenido de un QR usa el formato compacto"""
+    return text.startswith(COMPACT_PREFIX)
+
+def encode_compact(reservation_id, room_id, start: datetime, end: datetime, secret: bytes = None) -> str:
+    """Genera el contenido compacto y firmado de un código QR.
+
+    Los IDs deben ser enteros (o textos numéricos) y las fechas se guardan con
+    precisión de minutos. Lanza ValueError si no se pueden representar.
+    """
+    try:
+        body = _BODY.pack(int(reservation_id), int(room_id), _to_minutes(start), _to_minutes(end))
+    except struct.error as e:
+        raise ValueError(str(e))
+    return COMPACT_PREFIX + base45_encode(body + _signature(body, secret or get_secret()))
+
+def decode_compact(text: str, secret: bytes = None):
+    """Verifica y decodifica un contenido compacto; devuelve None si es inválido o la firma no coincide"""
+    if not is_compact(text):
+        return None
+    try:
+        raw = base45_decode(text[len(COMPACT_PREFIX):])
+    except ValueError:
+        return None
+    if len(raw) != _BODY.size + HMAC_SIZE:
+        return None
+    body, signature = raw[:_BODY.size], raw[_BODY.size:]
+    if not hmac.compare_digest(signature, _signature(body, secret or get_secret())):
+        return None
+    reservation_id, room_id, start, end = _BODY.unpack(body)
+    return {
+        "reservation_id": reservation_id,
+        "room_id": room_id,
+        "start_time": _from_minutes(start),
+        "end_time": _from_minutes(end)
+    }
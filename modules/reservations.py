@@ -1,33 +1,31 @@
 from flet import *
-import json
+import csv
 import os
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
-from modules.rooms import get_room
-from modules.users import get_user
+from modules.rooms import get_room, load_rooms
+from modules.users import get_user, load_users
+from modules.storage import JSON_FILES, get_storage
+from modules.kiosk import publish_revocation
 
-# Ruta del archivo de reservas
-RESERVATIONS_FILE = "data/reservations.json"
+# Ruta del archivo de reservas (backend JSON)
+RESERVATIONS_FILE = JSON_FILES["reservations"]
 QR_DIR = "data/qr_codes"
 
+# Campos obligatorios de cada fila en una importación masiva
+IMPORT_FIELDS = ("room_id", "user_id", "start_time", "end_time", "purpose")
+
 def load_reservations():
-    """Carga las reservas desde el archivo JSON"""
-    if not os.path.exists(RESERVATIONS_FILE):
-        return {}
-    try:
-        with open(RESERVATIONS_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return {}
+    """Carga las reservas desde el almacenamiento"""
+    return get_storage().load("reservations")
 
 def save_reservations(reservations):
-    """Guarda las reservas en el archivo JSON"""
-    os.makedirs(os.path.dirname(RESERVATIONS_FILE), exist_ok=True)
-    with open(RESERVATIONS_FILE, "w") as f:
-        json.dump(reservations, f, indent=4)
+    """Guarda las reservas en el almacenamiento"""
+    get_storage().save("reservations", reservations)
 
 def create_reservation(room_id, user_id, start_time, end_time, purpose, attendees=None):
     """Crea una nueva reserva"""
-    reservations = load_reservations()
+    storage = get_storage()
     
     # Verificar si el salón existe
     room = get_room(room_id)
@@ -39,87 +37,185 @@ def create_reservation(room_id, user_id, start_time, end_time, purpose, attendee
     if not user:
         return False, "Usuario no encontrado"
     
-    # Verificar disponibilidad del salón
-    for reservation in reservations.values():
-        if reservation["room_id"] == room_id:
-            # Convertir strings a datetime para comparación
-            existing_start = datetime.fromisoformat(reservation["start_time"])
-            existing_end = datetime.fromisoformat(reservation["end_time"])
-            new_start = datetime.fromisoformat(start_time)
-            new_end = datetime.fromisoformat(end_time)
-            
-            # Verificar superposición de horarios
-            if (new_start < existing_end and new_end > existing_start):
-                return False, "El salón ya está reservado en ese horario"
+    # Verificar disponibilidad y crear la reserva sin que otra escritura
+    # sobre el mismo salón se intercale
+    with storage.atomic("reservations", room_id):
+        if storage.find_overlapping(room_id, start_time, end_time):
+            return False, "El salón ya está reservado en ese horario"
+        
+        # Crear nueva reserva
+        storage.insert("reservations", {
+            "room_id": room_id,
+            "user_id": user_id,
+            "start_time": start_time,
+            "end_time": end_time,
+            "purpose": purpose,
+            "attendees": attendees or [],
+            "status": "pending",
+            "checked_in_at": None,
+            "created_at": datetime.now().isoformat()
+        })
+    return True, "Reserva creada exitosamente"
+
+def import_reservations(bookings):
+    """Importa un lote de reservas en una sola escritura.
+
+    Las filas válidas se ordenan por salón y hora de inicio y se comparan en una
+    sola pasada contra las reservas existentes y contra las filas ya aceptadas
+    del lote. Devuelve un reporte por fila, en el orden recibido.
+    """
+    storage = get_storage()
+    rooms = load_rooms()
+    users = load_users()
+    report = [{"row": i + 1, "accepted": False, "reservation_id": None, "message": ""}
+              for i in range(len(bookings))]
     
-    # Crear nueva reserva
-    reservation_id = str(len(reservations) + 1)
-    reservations[reservation_id] = {
-        "room_id": room_id,
-        "user_id": user_id,
-        "start_time": start_time,
-        "end_time": end_time,
-        "purpose": purpose,
-        "attendees": attendees or [],
-        "status": "pending",
-        "created_at": datetime.now().isoformat()
-    }
+    # Validar cada fila
+    candidates = []
+    for i, booking in enumerate(bookings):
+        missing = [field for field in IMPORT_FIELDS if not booking.get(field)]
+        if missing:
+            report[i]["message"] = f"Faltan campos: {', '.join(missing)}"
+            continue
+        try:
+            start = datetime.fromisoformat(booking["start_time"])
+            end = datetime.fromisoformat(booking["end_time"])
+        except ValueError:
+            report[i]["message"] = "Fecha u hora inválida"
+            continue
+        if end <= start:
+            report[i]["message"] = "La hora de fin debe ser posterior a la de inicio"
+        elif booking["room_id"] not in rooms:
+            report[i]["message"] = "Salón no encontrado"
+        elif booking["user_id"] not in users:
+            report[i]["message"] = "Usuario no encontrado"
+        else:
+            candidates.append((booking["room_id"], start, end, i))
+    candidates.sort()
     
-    save_reservations(reservations)
-    return True, "Reserva creada exitosamente"
+    room_ids = {room_id for room_id, _, _, _ in candidates}
+    accepted = []
+    with storage.atomic("reservations", *room_ids):
+        # Horarios existentes de los salones involucrados (inicios y fines ordenados)
+        existing = {room_id: ([], []) for room_id in room_ids}
+        for reservation in load_reservations().values():
+            if reservation["room_id"] in existing:
+                starts, ends = existing[reservation["room_id"]]
+                starts.append(datetime.fromisoformat(reservation["start_time"]))
+                ends.append(datetime.fromisoformat(reservation["end_time"]))
+        for starts, ends in existing.values():
+            starts.sort()
+            ends.sort()
+        
+        # Barrido por salón y hora de inicio
+        current_room, accepted_until = None, None
+        for room_id, start, end, i in candidates:
+            if room_id != current_room:
+                current_room, accepted_until = room_id, None
+            starts, ends = existing[room_id]
+            if bisect_left(starts, end) - bisect_right(ends, start) > 0:
+                report[i]["message"] = "El salón ya está reservado en ese horario"
+            elif accepted_until is not None and start < accepted_until:
+                report[i]["message"] = "Se superpone con otra reserva del lote"
+            else:
+                accepted_until = end
+                accepted.append(i)
+        
+        created_at = datetime.now().isoformat()
+        keys = storage.insert_many("reservations", [{
+            "room_id": bookings[i]["room_id"],
+            "user_id": bookings[i]["user_id"],
+            "start_time": bookings[i]["start_time"],
+            "end_time": bookings[i]["end_time"],
+            "purpose": bookings[i]["purpose"],
+            "attendees": bookings[i].get("attendees") or [],
+            "status": "pending",
+            "checked_in_at": None,
+            "created_at": created_at
+        } for i in accepted]) if accepted else []
+    
+    for i, reservation_id in zip(accepted, keys):
+        report[i].update(accepted=True, reservation_id=reservation_id,
+                         message="Reserva creada exitosamente")
+    return report
+
+def import_reservations_csv(path):
+    """Importa reservas desde un CSV con columnas room_id, user_id, start_time, end_time, purpose y attendees"""
+    with open(path, newline="", encoding="utf-8") as f:
+        bookings = []
+        for row in csv.DictReader(f):
+            # Los asistentes van separados por punto y coma
+            row["attendees"] = [a.strip() for a in (row.get("attendees") or "").split(";") if a.strip()]
+            bookings.append(row)
+    return import_reservations(bookings)
 
 def get_reservation(reservation_id):
     """Obtiene una reserva por su ID"""
-    reservations = load_reservations()
-    return reservations.get(reservation_id)
+    return get_storage().get("reservations", reservation_id)
 
 def get_user_reservations(user_id):
     """Obtiene todas las reservas de un usuario"""
-    reservations = load_reservations()
-    return {id: res for id, res in reservations.items() if res["user_id"] == user_id}
+    return get_storage().find("reservations", "user_id", user_id)
 
 def get_room_reservations(room_id):
     """Obtiene todas las reservas de un salón"""
-    reservations = load_reservations()
-    return {id: res for id, res in reservations.items() if res["room_id"] == room_id}
+    return get_storage().find("reservations", "room_id", room_id)
 
 def update_reservation(reservation_id, **kwargs):
     """Actualiza los detalles de una reserva"""
-    reservations = load_reservations()
-    if reservation_id not in reservations:
-        return False, "Reserva no encontrada"
-    
-    for key, value in kwargs.items():
-        if key in reservations[reservation_id]:
-            reservations[reservation_id][key] = value
-    
-    save_reservations(reservations)
+    storage = get_storage()
+    with storage.atomic("reservations", reservation_id):
+        reservation = storage.get("reservations", reservation_id)
+        if reservation is None:
+            return False, "Reserva no encontrada"
+        
+        for key, value in kwargs.items():
+            if key in reservation:
+                reservation[key] = value
+        
+        storage.put("reservations", reservation_id, reservation)
     return True, "Reserva actualizada exitosamente"
 
+def check_in_reservation(reservation_id, when=None):
+    """Registra el ingreso al salón (solo el primero cuenta)"""
+    storage = get_storage()
+    with storage.atomic("reservations", reservation_id):
+        reservation = storage.get("reservations", reservation_id)
+        if reservation is None:
+            return False, "Reserva no encontrada"
+        if reservation.get("status") == "cancelled":
+            return False, "La reserva está cancelada"
+        if reservation.get("checked_in_at"):
+            return True, "El ingreso ya estaba registrado"
+        reservation["checked_in_at"] = (when or datetime.now()).isoformat()
+        storage.put("reservations", reservation_id, reservation)
+    return True, "Ingreso registrado exitosamente"
+
+def check_in_reservations(reservation_ids, when=None):
+    """Registra el ingreso de varias reservas en una sola escritura; devuelve los IDs registrados"""
+    storage = get_storage()
+    checked_in_at = (when or datetime.now()).isoformat()
+    updates = {}
+    with storage.atomic("reservations", *reservation_ids):
+        for reservation_id in reservation_ids:
+            reservation = storage.get("reservations", reservation_id)
+            if reservation is None or reservation.get("status") == "cancelled" or reservation.get("checked_in_at"):
+                continue
+            reservation["checked_in_at"] = checked_in_at
+            updates[reservation_id] = reservation
+        if updates:
+            storage.put_many("reservations", updates)
+    return list(updates)
+
 def delete_reservation(reservation_id):
     """Elimina una reserva"""
-    reservations = load_reservations()
-    if reservation_id not in reservations:
+    if not get_storage().delete("reservations", reservation_id):
         return False, "Reserva no encontrada"
-    
-    del reservations[reservation_id]
-    save_reservations(reservations)
     return True, "Reserva eliminada exitosamente"
 
 def check_room_availability(room_id, start_time, end_time):
     """Verifica la disponibilidad de un salón en un horario específico"""
-    reservations = get_room_reservations(room_id)
-    new_start = datetime.fromisoformat(start_time)
-    new_end = datetime.fromisoformat(end_time)
-    
-    for reservation in reservations.values():
-        existing_start = datetime.fromisoformat(reservation["start_time"])
-        existing_end = datetime.fromisoformat(reservation["end_time"])
-        
-        if (new_start < existing_end and new_end > existing_start):
-            return False
-    
-    return True
+    return not get_storage().find_overlapping(room_id, start_time, end_time)
 
 def delete_qr_code(reservation_id):
     """Elimina el código QR de una reserva"""
@@ -153,6 +249,8 @@ def cancelar_reserva(reservation_id, user_id):
         if success:
             # Eliminar el código QR si existe
             delete_qr_code(reservation_id)
+            # Avisar a los kioscos para que rechacen el código
+            publish_revocation(reservation_id)
             return True, "Reserva cancelada exitosamente"
         return False, message
         
@@ -176,6 +274,8 @@ def cancelar_reserva_admin(reservation_id):
         if success:
             # Eliminar el código QR si existe
             delete_qr_code(reservation_id)
+            # Avisar a los kioscos para que rechacen el código
+            publish_revocation(reservation_id)
             return True, "Reserva cancelada exitosamente"
         return False, message
         
@@ -1,6 +1,19 @@
-from dataclasses import dataclass
-from typing import List, Optional
-from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from heapq import merge, nlargest, nsmallest
+from itertools import islice
+from operator import itemgetter
+import os
+import threading
+from dateutil.rrule import rrulestr
+from modules.locks import StripedLock
+from modules.planificador import Planificador
+from modules.kiosk import SALAS_REVOCATIONS_FILE, KioskValidator, clear_revocations, publish_revocation
+from modules.qr_payload import SCOPE_SALAS, get_secret
+from modules.eventos import BusEventos, obtener_bus_eventos
 
 @dataclass
 class Sala:
@@ -18,12 +31,246 @@ class Reserva:
     usuario_email: str
     fecha_inicio: datetime
     fecha_fin: datetime
-    estado: str  # 'activa', 'cancelada', 'completada'
+    estado: str  # 'activa', 'en_curso', 'cancelada', 'liberada', 'completada'
+    checkin: Optional[datetime] = None
+
+# Estados de una reserva que todavía ocupa (o va a ocupar) la sala
+ESTADOS_VIGENTES = ('activa', 'en_curso')
+
+# Estados de una reserva que dejó la sala libre sin usarse (cancelada o por ausencia)
+ESTADOS_ANULADOS = ('cancelada', 'liberada')
+
+# Tiempo desde el inicio para registrar el ingreso antes de liberar la sala
+# en el gestor compartido (minutos, variable de entorno NO_SHOW_MINUTES). Sin
+# ella no se libera por ausencia: hace falta un kiosco que registre los
+# ingresos (ver GestorSalas.crear_kiosco)
+GRACIA_NO_SHOW = (timedelta(minutes=int(os.environ["NO_SHOW_MINUTES"]))
+                  if os.environ.get("NO_SHOW_MINUTES") else None)
+
+@dataclass
+class SolicitudEspera:
+    """Pedido de un horario en cualquiera de varias salas, a la espera de que alguna se libere"""
+    id: int
+    usuario_email: str
+    fecha_inicio: datetime
+    fecha_fin: datetime
+    salas_ids: Tuple[int, ...]
+    estado: str  # 'esperando', 'asignando', 'asignada', 'retirada', 'vencida'
+    reserva_id: Optional[int] = None
+    al_asignar: object = field(default=None, repr=False, compare=False)
+
+# Duración de un periodo de la regla para las frecuencias de paso fijo
+_PASOS_FRECUENCIA = {
+    "WEEKLY": timedelta(weeks=1),
+    "DAILY": timedelta(days=1),
+    "HOURLY": timedelta(hours=1),
+}
+
+# Horas del día (inicio, fin) en que se sugieren horarios de reserva
+HORARIO_LECTIVO = (8, 22)
+
+@dataclass
+class ReservaRecurrente:
+    """Reserva que se repite según una regla RRULE (RFC 5545).
+
+    Solo se guarda la regla; las ocurrencias se calculan al consultar una
+    ventana de tiempo. `fecha_inicio`/`fecha_fin` son los de la primera
+    ocurrencia y `hasta` el fin de la última.
+    """
+    id: int
+    sala_id: int
+    usuario_email: str
+    fecha_inicio: datetime
+    fecha_fin: datetime
+    regla: str  # p. ej. 'FREQ=WEEKLY;COUNT=15'
+    hasta: datetime
+    estado: str  # 'activa', 'cancelada'
+    _rrule: object = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._rrule = rrulestr(self.regla, dtstart=self.fecha_inicio)
+
+    @property
+    def duracion(self) -> timedelta:
+        return self.fecha_fin - self.fecha_inicio
+
+    def _regla_cercana(self, instante: datetime):
+        """Regla equivalente con el inicio adelantado en periodos completos hasta `instante`.
+
+        Para frecuencias de paso fijo evita recorrer todas las ocurrencias
+        anteriores a la ventana consultada.
+        """
+        partes = dict(p.split("=", 1) for p in self.regla.upper().replace("RRULE:", "").split(";") if "=" in p)
+        paso = _PASOS_FRECUENCIA.get(partes.get("FREQ"))
+        if paso is None or "COUNT" in partes or "BYSETPOS" in partes or instante <= self.fecha_inicio:
+            return self._rrule
+        paso *= int(partes.get("INTERVAL", 1))
+        periodos = (instante - self.fecha_inicio) // paso
+        return self._rrule.replace(dtstart=self.fecha_inicio + periodos * paso)
+
+    def ocurrencias(self, desde: datetime, hasta: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        """Genera las ocurrencias (inicio, fin) que se solapan con [desde, hasta)"""
+        if hasta <= self.fecha_inicio or desde >= self.hasta:
+            return
+        duracion = self.duracion
+        limite = desde - duracion
+        for inicio in self._regla_cercana(limite).xafter(limite, inc=False):
+            if inicio >= hasta:
+                break
+            yield inicio, inicio + duracion
+
+class IndiceIntervalos:
+    """Índice de intervalos ocupados por sala.
+
+    Mantiene por cada sala dos listas ordenadas (inicios y fines). Los
+    intervalos que se solapan con [inicio, fin) son los que empiezan antes de
+    `fin` menos los que terminan antes o justo en `inicio`, por lo que la
+    consulta cuesta dos búsquedas binarias. Una tercera lista de pares
+    (inicio, fin) permite recorrer en orden los intervalos de una ventana.
+    """
 
-class GestorSalas:
     def __init__(self):
-        # Simulación de datos
-        self.salas = [
+        self._inicios: Dict[int, List[datetime]] = {}
+        self._fines: Dict[int, List[datetime]] = {}
+        self._intervalos: Dict[int, List[Tuple[datetime, datetime]]] = {}
+        self._duracion_max: Dict[int, timedelta] = {}
+
+    def agregar(self, sala_id: int, inicio: datetime, fin: datetime):
+        self._duracion_max[sala_id] = max(self._duracion_max.get(sala_id, timedelta(0)), fin - inicio)
+        insort(self._intervalos.setdefault(sala_id, []), (inicio, fin))
+        insort(self._inicios.setdefault(sala_id, []), inicio)
+        insort(self._fines.setdefault(sala_id, []), fin)
+
+    def quitar(self, sala_id: int, inicio: datetime, fin: datetime) -> bool:
+        inicios = self._inicios.get(sala_id, [])
+        fines = self._fines.get(sala_id, [])
+        i = bisect_left(inicios, inicio)
+        j = bisect_left(fines, fin)
+        if i == len(inicios) or inicios[i] != inicio or j == len(fines) or fines[j] != fin:
+            return False
+        # Primero el fin: un lector concurrente puede ver la sala ocupada de más
+        # durante un instante, pero nunca libre de más
+        del fines[j]
+        intervalos = self._intervalos[sala_id]
+        del intervalos[bisect_left(intervalos, (inicio, fin))]
+        del inicios[i]
+        return True
+
+    def contar_solapamientos(self, sala_id: int, inicio: datetime, fin: datetime) -> int:
+        inicios = self._inicios.get(sala_id)
+        if not inicios:
+            return 0
+        return bisect_left(inicios, fin) - bisect_right(self._fines[sala_id], inicio)
+
+    def esta_libre(self, sala_id: int, inicio: datetime, fin: datetime) -> bool:
+        return self.contar_solapamientos(sala_id, inicio, fin) == 0
+
+    def intervalos(self, sala_id: int, desde: datetime, hasta: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        """Genera en orden de inicio los intervalos que se solapan con [desde, hasta)"""
+        intervalos = self._intervalos.get(sala_id)
+        if not intervalos:
+            return
+        # Ningún intervalo que empiece antes de esto puede llegar a `desde`
+        i = bisect_left(intervalos, (desde - self._duracion_max[sala_id],))
+        for inicio, fin in intervalos[i:bisect_left(intervalos, (hasta,))]:
+            if fin > desde:
+                yield inicio, fin
+
+    def __len__(self) -> int:
+        return sum(len(inicios) for inicios in self._inicios.values())
+
+class ListaEspera:
+    """Solicitudes en espera por sala, ordenadas por horario.
+
+    Igual que el índice de intervalos, guarda por sala una lista ordenada por
+    inicio: las solicitudes que se solapan con un horario liberado se ubican
+    con una búsqueda binaria, sin recorrer las de otros horarios ni salas.
+    """
+
+    def __init__(self):
+        self._por_sala: Dict[int, List[Tuple[datetime, datetime, int]]] = {}
+        self._duracion_max: Dict[int, timedelta] = {}
+        self._solicitudes: Dict[int, SolicitudEspera] = {}
+
+    def agregar(self, solicitud: SolicitudEspera):
+        self._solicitudes[solicitud.id] = solicitud
+        duracion = solicitud.fecha_fin - solicitud.fecha_inicio
+        for sala_id in solicitud.salas_ids:
+            self._duracion_max[sala_id] = max(self._duracion_max.get(sala_id, timedelta(0)), duracion)
+            insort(self._por_sala.setdefault(sala_id, []),
+                   (solicitud.fecha_inicio, solicitud.fecha_fin, solicitud.id))
+
+    def quitar(self, solicitud: SolicitudEspera) -> bool:
+        if self._solicitudes.pop(solicitud.id, None) is None:
+            return False
+        clave = (solicitud.fecha_inicio, solicitud.fecha_fin, solicitud.id)
+        for sala_id in solicitud.salas_ids:
+            entradas = self._por_sala[sala_id]
+            del entradas[bisect_left(entradas, clave)]
+        return True
+
+    def obtener(self, solicitud_id: int) -> Optional[SolicitudEspera]:
+        return self._solicitudes.get(solicitud_id)
+
+    def candidatas(self, sala_id: int, inicio: datetime, fin: datetime) -> List[SolicitudEspera]:
+        """Solicitudes de la sala que se solapan con [inicio, fin), por orden de llegada"""
+        entradas = self._por_sala.get(sala_id)
+        if not entradas:
+            return []
+        i = bisect_left(entradas, (inicio - self._duracion_max[sala_id],))
+        ids = sorted(solicitud_id for otro_inicio, otro_fin, solicitud_id
+                     in entradas[i:bisect_left(entradas, (fin,))] if otro_fin > inicio)
+        return [self._solicitudes[solicitud_id] for solicitud_id in ids]
+
+    def __len__(self) -> int:
+        return len(self._solicitudes)
+
+class EstadisticasReservas:
+    """Contadores de reservas que se actualizan al crear o cambiar de estado.
+
+    Las reservas anuladas (canceladas o liberadas) cuentan en el total y en su
+    estado, pero no en los contadores por sala ni por usuario.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.por_estado: Counter = Counter()
+        self.por_sala: Counter = Counter()
+        self.por_usuario: Counter = Counter()
+
+    @property
+    def activas(self) -> int:
+        """Reservas vigentes (por comenzar o en curso); no cuenta las completadas"""
+        return sum(self.por_estado[estado] for estado in ESTADOS_VIGENTES)
+
+    def registrar(self, reserva: Reserva):
+        self.total += 1
+        self.por_estado[reserva.estado] += 1
+        if reserva.estado not in ESTADOS_ANULADOS:
+            self.por_sala[reserva.sala_id] += 1
+            self.por_usuario[reserva.usuario_email] += 1
+
+    def cambiar_estado(self, reserva: Reserva, anterior: str):
+        self.por_estado[anterior] -= 1
+        self.por_estado[reserva.estado] += 1
+        if (anterior in ESTADOS_ANULADOS) != (reserva.estado in ESTADOS_ANULADOS):
+            delta = 1 if anterior in ESTADOS_ANULADOS else -1
+            self.por_sala[reserva.sala_id] += delta
+            self.por_usuario[reserva.usuario_email] += delta
+
+    def top_salas(self, k: int = 3) -> List[Tuple[int, int]]:
+        """Las k salas con más reservas no canceladas, como (sala_id, cantidad)"""
+        return [par for par in nlargest(k, self.por_sala.items(), key=itemgetter(1)) if par[1] > 0]
+
+    def top_usuarios(self, k: int = 3) -> List[Tuple[str, int]]:
+        """Los k usuarios con más reservas no canceladas, como (email, cantidad)"""
+        return [par for par in nlargest(k, self.por_usuario.items(), key=itemgetter(1)) if par[1] > 0]
+
+class GestorSalas:
+    def __init__(self, gracia_no_show: Optional[timedelta] = None,
+                 eventos: Optional[BusEventos] = None, salas: Optional[List[Sala]] = None):
+        # Simulación de datos (salvo que se indiquen las salas, p. ej. en los benchmarks)
+        self.salas = list(salas) if salas is not None else [
             Sala(1, "Sala A101", 30, True, True, True),
             Sala(2, "Sala B202", 20, True, False, True),
             Sala(3, "Sala C303", 40, True, True, False),
@@ -31,6 +278,38 @@ class GestorSalas:
         ]
         self.reservas = []
         self._next_reserva_id = 1
+        # Índices secundarios; se mantienen en cada alta y cambio de estado
+        self._salas_por_id: Dict[int, Sala] = {s.id: s for s in self.salas}
+        self._reservas_por_id: Dict[int, Reserva] = {}
+        self._reservas_por_usuario: Dict[str, Dict[int, Reserva]] = {}
+        self._reservas_por_estado: Dict[str, Dict[int, Reserva]] = {}
+        self.reservas_recurrentes: List[ReservaRecurrente] = []
+        self._recurrentes_por_sala: Dict[int, List[ReservaRecurrente]] = {}
+        self._next_recurrente_id = 1
+        # Índice de reservas activas por sala para las consultas de disponibilidad
+        self._indice = IndiceIntervalos()
+        # Contadores para el panel de estadísticas
+        self.estadisticas = EstadisticasReservas()
+        # Candados por franja (según la sala) para verificar e insertar de forma
+        # atómica, y uno general para la lista de reservas y el contador de IDs
+        self._locks_sala = StripedLock()
+        self._lock = threading.Lock()
+        # Transiciones activa -> en_curso -> completada a la hora de inicio y fin,
+        # y liberación de las reservas sin ingreso al vencer la gracia (None: nunca)
+        self.planificador = Planificador()
+        self.gracia_no_show = gracia_no_show
+        self._suscriptores = []
+        # Bus donde se publican las altas y cambios para las sesiones conectadas
+        self.eventos = eventos
+        # Solicitudes en espera; se asignan cuando se anula una reserva que las deja entrar
+        self.lista_espera = ListaEspera()
+        self._lock_espera = threading.Lock()
+        self._next_solicitud_id = 1
+        self.suscribir(self._promover_espera)
+
+    def suscribir(self, callback):
+        """Registra `callback(reserva, estado_anterior)`, llamado después de cada alta (anterior None) o cambio de estado"""
+        self._suscriptores.append(callback)
 
     def buscar_salas_disponibles(
         self,
@@ -43,26 +322,99 @@ class GestorSalas:
     ) -> List[Sala]:
         salas_disponibles = []
         for sala in self.salas:
-            if (sala.capacidad >= capacidad_min and
-                (not requiere_proyector or sala.tiene_proyector) and
-                (not requiere_pizarra or sala.tiene_pizarra_digital) and
-                (not requiere_accesible or sala.es_accesible)):
+            if self._cumple_requisitos(sala, capacidad_min, requiere_proyector,
+                                       requiere_pizarra, requiere_accesible):
                 
                 # Verificar si la sala está disponible en el horario
-                disponible = True
-                for reserva in self.reservas:
-                    if (reserva.sala_id == sala.id and
-                        reserva.estado == 'activa' and
-                        not (fecha_fin <= reserva.fecha_inicio or
-                             fecha_inicio >= reserva.fecha_fin)):
-                        disponible = False
-                        break
-                
-                if disponible:
+                if self._sala_libre(sala.id, fecha_inicio, fecha_fin):
                     salas_disponibles.append(sala)
         
         return salas_disponibles
 
+    def _cumple_requisitos(
+        self,
+        sala: Sala,
+        capacidad_min: int = 0,
+        requiere_proyector: bool = False,
+        requiere_pizarra: bool = False,
+        requiere_accesible: bool = False
+    ) -> bool:
+        return (sala.capacidad >= capacidad_min and
+                (not requiere_proyector or sala.tiene_proyector) and
+                (not requiere_pizarra or sala.tiene_pizarra_digital) and
+                (not requiere_accesible or sala.es_accesible))
+
+    def salas_compatibles(self, **requisitos) -> List[Sala]:
+        """Salas que cumplen los requisitos, sin mirar la disponibilidad"""
+        return [sala for sala in self.salas if self._cumple_requisitos(sala, **requisitos)]
+
+    def _ocupados_sala(self, sala_id: int, desde: datetime, hasta: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        """Intervalos ocupados de la sala en [desde, hasta) por orden de inicio: reservas del índice y series activas"""
+        return merge(
+            self._indice.intervalos(sala_id, desde, hasta),
+            *(serie.ocurrencias(desde, hasta)
+              for serie in list(self._recurrentes_por_sala.get(sala_id, [])) if serie.estado == 'activa')
+        )
+
+    def intervalos_libres(self, sala_id: int, desde: datetime, hasta: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        """Genera en orden los intervalos libres de la sala dentro de [desde, hasta)"""
+        return _huecos(self._ocupados_sala(sala_id, desde, hasta), desde, hasta)
+
+    def intervalos_ocupados(self, desde: datetime, hasta: datetime) -> Iterator[Tuple[int, datetime, datetime]]:
+        """Genera (sala_id, inicio, fin) de las reservas no anuladas y las ocurrencias de series activas en [desde, hasta)"""
+        for sala in self.salas:
+            for inicio, fin in self._ocupados_sala(sala.id, desde, hasta):
+                yield sala.id, inicio, fin
+
+    def sugerir_horarios(
+        self,
+        duracion: timedelta,
+        desde: datetime,
+        horizonte: timedelta = timedelta(days=7),
+        cantidad: int = 5,
+        horario: Tuple[int, int] = HORARIO_LECTIVO,
+        **requisitos
+    ) -> List[Tuple[Sala, datetime, datetime]]:
+        """Los primeros `cantidad` horarios libres de `duracion` desde `desde`, en las salas que cumplen los requisitos.
+
+        Los intervalos libres de cada sala salen ya ordenados del índice; se
+        recortan al horario lectivo y se mezclan con heapq.merge, así que solo
+        se recorre hasta encontrar los horarios pedidos. A igual hora se
+        prefiere la sala más chica.
+        """
+        hasta = desde + horizonte
+
+        def horarios(sala):
+            for inicio, fin in _en_horario(self.intervalos_libres(sala.id, desde, hasta), horario):
+                if fin - inicio >= duracion:
+                    yield inicio, sala.capacidad, sala.id
+
+        primeros = islice(merge(*(horarios(sala) for sala in self.salas_compatibles(**requisitos))), cantidad)
+        return [(self._salas_por_id[sala_id], inicio, inicio + duracion) for inicio, _, sala_id in primeros]
+
+    def salas_alternativas(
+        self,
+        fecha_inicio: datetime,
+        fecha_fin: datetime,
+        capacidad_min: int = 0,
+        cantidad: int = 3,
+        **requisitos
+    ) -> List[Sala]:
+        """Salas libres en el horario que no cumplen todos los requisitos, de capacidad más cercana a la pedida"""
+        libres = [sala for sala in self.salas
+                  if not self._cumple_requisitos(sala, capacidad_min, **requisitos)
+                  and self._sala_libre(sala.id, fecha_inicio, fecha_fin)]
+        return nsmallest(cantidad, libres, key=lambda sala: (abs(sala.capacidad - capacidad_min), sala.id))
+
+    def _sala_libre(self, sala_id: int, fecha_inicio: datetime, fecha_fin: datetime) -> bool:
+        """Disponibilidad según el índice y las reservas recurrentes de la sala"""
+        if not self._indice.esta_libre(sala_id, fecha_inicio, fecha_fin):
+            return False
+        for serie in self._recurrentes_por_sala.get(sala_id, []):
+            if serie.estado == 'activa' and next(serie.ocurrencias(fecha_inicio, fecha_fin), None):
+                return False
+        return True
+
     def crear_reserva(
         self,
         sala_id: int,
@@ -70,33 +422,354 @@ class GestorSalas:
         fecha_inicio: datetime,
         fecha_fin: datetime
     ) -> Optional[Reserva]:
-        # Verificar disponibilidad
-        sala = next((s for s in self.salas if s.id == sala_id), None)
-        if not sala:
+        # Verificar disponibilidad (el índice supone intervalos con inicio < fin)
+        sala = self._salas_por_id.get(sala_id)
+        if not sala or fecha_fin <= fecha_inicio:
             return None
 
-        # Crear la reserva
-        reserva = Reserva(
-            id=self._next_reserva_id,
-            sala_id=sala_id,
-            usuario_email=usuario_email,
-            fecha_inicio=fecha_inicio,
-            fecha_fin=fecha_fin,
-            estado='activa'
-        )
-        self._next_reserva_id += 1
-        self.reservas.append(reserva)
+        with self._locks_sala.for_key(sala_id):
+            if not self._sala_libre(sala_id, fecha_inicio, fecha_fin):
+                return None
+
+            # Crear la reserva
+            with self._lock:
+                reserva = Reserva(
+                    id=self._next_reserva_id,
+                    sala_id=sala_id,
+                    usuario_email=usuario_email,
+                    fecha_inicio=fecha_inicio,
+                    fecha_fin=fecha_fin,
+                    estado='activa'
+                )
+                self._next_reserva_id += 1
+                self.reservas.append(reserva)
+                self._indexar(reserva)
+                self.estadisticas.registrar(reserva)
+            self._indice.agregar(sala_id, fecha_inicio, fecha_fin)
+        self.planificador.programar(fecha_inicio, self._avanzar_estado, reserva.id, 'activa', 'en_curso')
+        self.planificador.programar(fecha_fin, self._avanzar_estado, reserva.id, 'en_curso', 'completada')
+        if self.gracia_no_show is not None:
+            self.planificador.programar(fecha_inicio + self.gracia_no_show, self._liberar_si_ausente, reserva.id)
+        self._notificar(reserva, None)
         return reserva
 
+    def crear_reserva_recurrente(
+        self,
+        sala_id: int,
+        usuario_email: str,
+        fecha_inicio: datetime,
+        fecha_fin: datetime,
+        regla: str
+    ) -> Optional[ReservaRecurrente]:
+        """Crea una reserva que se repite según `regla` (RRULE con COUNT o UNTIL).
+
+        Todas las ocurrencias se comparan de una sola pasada contra las
+        reservas del índice y las demás series de la sala, ordenadas por inicio.
+        """
+        sala = self._salas_por_id.get(sala_id)
+        if not sala or fecha_fin <= fecha_inicio:
+            return None
+        # Solo se aceptan series acotadas: la última ocurrencia fija el rango a verificar
+        partes = [p for p in regla.upper().replace("RRULE:", "").split(";") if p]
+        if not any(p.startswith(("COUNT=", "UNTIL=")) for p in partes):
+            return None
+        try:
+            ultima = rrulestr(regla, dtstart=fecha_inicio)[-1]
+        except (ValueError, IndexError):
+            return None
+        # COUNT se guarda como UNTIL para poder expandir desde cualquier ventana
+        regla = ";".join([p for p in partes if not p.startswith(("COUNT=", "UNTIL="))] +
+                         [f"UNTIL={ultima.strftime('%Y%m%dT%H%M%S')}"])
+        hasta = ultima + (fecha_fin - fecha_inicio)
+
+        with self._locks_sala.for_key(sala_id):
+            with self._lock:
+                serie = ReservaRecurrente(
+                    id=self._next_recurrente_id,
+                    sala_id=sala_id,
+                    usuario_email=usuario_email,
+                    fecha_inicio=fecha_inicio,
+                    fecha_fin=fecha_fin,
+                    regla=regla,
+                    hasta=hasta,
+                    estado='activa'
+                )
+            ocupados = merge(
+                self._indice.intervalos(sala_id, fecha_inicio, hasta),
+                *(otra.ocurrencias(fecha_inicio, hasta)
+                  for otra in self._recurrentes_por_sala.get(sala_id, []) if otra.estado == 'activa')
+            )
+            if _hay_solapamiento(serie.ocurrencias(fecha_inicio, hasta), ocupados):
+                return None
+            with self._lock:
+                self._next_recurrente_id += 1
+                self.reservas_recurrentes.append(serie)
+            self._recurrentes_por_sala.setdefault(sala_id, []).append(serie)
+        return serie
+
+    def cancelar_reserva_recurrente(self, serie_id: int) -> bool:
+        serie = next((r for r in self.reservas_recurrentes if r.id == serie_id), None)
+        if not serie:
+            return False
+        with self._locks_sala.for_key(serie.sala_id):
+            if serie.estado != 'activa':
+                return False
+            serie.estado = 'cancelada'
+            self._recurrentes_por_sala[serie.sala_id].remove(serie)
+        # Las ocurrencias que quedan libres pasan a las solicitudes en espera de la sala
+        self._asignar_espera(serie.sala_id, max(serie.fecha_inicio, datetime.now()), serie.hasta)
+        return True
+
+    def obtener_reservas_recurrentes_usuario(self, usuario_email: str) -> List[ReservaRecurrente]:
+        return [r for r in self.reservas_recurrentes if r.usuario_email == usuario_email and r.estado == 'activa']
+
+    def agregar_sala(self, sala: Sala):
+        with self._lock:
+            self.salas.append(sala)
+            self._salas_por_id[sala.id] = sala
+        if self.eventos is not None:
+            self.eventos.publicar("salas", "alta", sala)
+
+    def obtener_sala(self, sala_id: int) -> Optional[Sala]:
+        return self._salas_por_id.get(sala_id)
+
+    def obtener_reserva(self, reserva_id: int) -> Optional[Reserva]:
+        return self._reservas_por_id.get(reserva_id)
+
+    def obtener_reservas_por_estado(self, estado: str) -> List[Reserva]:
+        return list(self._reservas_por_estado.get(estado, {}).values())
+
     def cancelar_reserva(self, reserva_id: int) -> bool:
-        reserva = next((r for r in self.reservas if r.id == reserva_id), None)
-        if reserva and reserva.estado == 'activa':
-            reserva.estado = 'cancelada'
-            return True
-        return False
+        return self._anular(reserva_id, 'cancelada')
+
+    def registrar_checkin(self, reserva_id: int, instante: Optional[datetime] = None) -> bool:
+        """Registra el ingreso a la sala (p. ej. al escanear el QR); evita la liberación por ausencia"""
+        reserva = self._reservas_por_id.get(reserva_id)
+        if not reserva:
+            return False
+        instante = instante or datetime.now()
+        with self._locks_sala.for_key(reserva.sala_id):
+            if reserva.estado not in ESTADOS_VIGENTES or instante >= reserva.fecha_fin:
+                return False
+            if reserva.checkin is None:
+                reserva.checkin = instante
+        return True
+
+    def crear_kiosco(self, sala_id: Optional[int] = None, **opciones) -> KioskValidator:
+        """Kiosco que valida los QR de las reservas de este gestor y registra el ingreso de las aceptadas"""
+        return KioskValidator(sala_id, secret=get_secret(SCOPE_SALAS), revocations_file=SALAS_REVOCATIONS_FILE,
+                              on_check_in=self.registrar_checkin, **opciones)
+
+    def _liberar_si_ausente(self, reserva_id: int):
+        """Vencimiento de la gracia: libera la sala si nadie registró el ingreso"""
+        reserva = self._reservas_por_id.get(reserva_id)
+        if reserva is not None and reserva.checkin is None:
+            self._anular(reserva_id, 'liberada')
+
+    def _anular(self, reserva_id: int, estado: str) -> bool:
+        """Pasa una reserva vigente a un estado anulado y libera su horario en el índice"""
+        reserva = self._reservas_por_id.get(reserva_id)
+        if not reserva:
+            return False
+        with self._locks_sala.for_key(reserva.sala_id):
+            if reserva.estado not in ESTADOS_VIGENTES or (estado == 'liberada' and reserva.checkin):
+                return False
+            anterior = self._cambiar_estado(reserva, estado)
+            self._indice.quitar(reserva.sala_id, reserva.fecha_inicio, reserva.fecha_fin)
+        self._notificar(reserva, anterior)
+        return True
+
+    def unirse_lista_espera(
+        self,
+        usuario_email: str,
+        fecha_inicio: datetime,
+        fecha_fin: datetime,
+        salas_ids: List[int],
+        al_asignar=None
+    ) -> Optional[SolicitudEspera]:
+        """Anota un pedido de [fecha_inicio, fecha_fin) en cualquiera de `salas_ids`.
+
+        Cuando se anula una reserva que deja libre el horario en alguna de las
+        salas, se crea la reserva y se llama a `al_asignar(solicitud, reserva)`.
+        La solicitud vence al llegar `fecha_inicio`.
+        """
+        salas_ids = tuple(sala_id for sala_id in dict.fromkeys(salas_ids) if sala_id in self._salas_por_id)
+        if not salas_ids or fecha_fin <= fecha_inicio:
+            return None
+        with self._lock_espera:
+            solicitud = SolicitudEspera(
+                id=self._next_solicitud_id,
+                usuario_email=usuario_email,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+                salas_ids=salas_ids,
+                estado='esperando',
+                al_asignar=al_asignar
+            )
+            self._next_solicitud_id += 1
+            self.lista_espera.agregar(solicitud)
+        self.planificador.programar(fecha_inicio, self._cerrar_solicitud, solicitud.id, 'vencida')
+        # Alguna sala pudo liberarse entre la búsqueda y el pedido
+        for sala_id in salas_ids:
+            self._asignar_espera(sala_id, fecha_inicio, fecha_fin)
+        return solicitud
+
+    def retirar_de_lista_espera(self, solicitud_id: int) -> bool:
+        return self._cerrar_solicitud(solicitud_id, 'retirada')
+
+    def _cerrar_solicitud(self, solicitud_id: int, estado: str) -> bool:
+        with self._lock_espera:
+            solicitud = self.lista_espera.obtener(solicitud_id)
+            if solicitud is None:
+                return False
+            solicitud.estado = estado
+            return self.lista_espera.quitar(solicitud)
+
+    def _promover_espera(self, reserva: Reserva, anterior: str):
+        """Suscriptor: el horario de una reserva anulada pasa a las solicitudes en espera que entran"""
+        if reserva.estado in ESTADOS_ANULADOS:
+            self._asignar_espera(reserva.sala_id, reserva.fecha_inicio, reserva.fecha_fin)
+
+    def _asignar_espera(self, sala_id: int, inicio: datetime, fin: datetime):
+        """Intenta reservar la sala para las solicitudes que se solapan con [inicio, fin), por orden de llegada.
+
+        Las candidatas se sacan de la lista con el candado tomado y las reservas
+        se crean después de soltarlo: crear_reserva avisa a los suscriptores, que
+        pueden volver a operar sobre la lista de espera.
+        """
+        with self._lock_espera:
+            candidatas = self.lista_espera.candidatas(sala_id, inicio, fin)
+            for solicitud in candidatas:
+                solicitud.estado = 'asignando'
+                self.lista_espera.quitar(solicitud)
+        asignadas = []
+        for solicitud in candidatas:
+            reserva = self.crear_reserva(sala_id, solicitud.usuario_email,
+                                         solicitud.fecha_inicio, solicitud.fecha_fin)
+            with self._lock_espera:
+                if reserva:
+                    solicitud.estado, solicitud.reserva_id = 'asignada', reserva.id
+                    asignadas.append((solicitud, reserva))
+                elif solicitud.fecha_inicio > datetime.now():
+                    # Sigue esperando; el ID conserva su lugar en el orden de llegada
+                    solicitud.estado = 'esperando'
+                    self.lista_espera.agregar(solicitud)
+                else:
+                    solicitud.estado = 'vencida'
+        for solicitud, reserva in asignadas:
+            if solicitud.al_asignar is None:
+                continue
+            try:
+                solicitud.al_asignar(solicitud, reserva)
+            except Exception as e:
+                print(f"Error al avisar una asignación de la lista de espera: {str(e)}")
+
+    def _avanzar_estado(self, reserva_id: int, anterior: str, estado: str):
+        """Transición programada; no hace nada si la reserva ya no está en `anterior`"""
+        reserva = self._reservas_por_id.get(reserva_id)
+        if reserva is None:
+            return
+        with self._locks_sala.for_key(reserva.sala_id):
+            if reserva.estado != anterior:
+                return
+            self._cambiar_estado(reserva, estado)
+        self._notificar(reserva, anterior)
+
+    def _indexar(self, reserva: Reserva):
+        """Agrega una reserva nueva a los índices (con self._lock tomado)"""
+        self._reservas_por_id[reserva.id] = reserva
+        self._reservas_por_usuario.setdefault(reserva.usuario_email, {})[reserva.id] = reserva
+        self._reservas_por_estado.setdefault(reserva.estado, {})[reserva.id] = reserva
+
+    def _cambiar_estado(self, reserva: Reserva, estado: str) -> str:
+        """Cambia el estado de una reserva manteniendo índices y estadísticas al día; devuelve el anterior"""
+        with self._lock:
+            anterior, reserva.estado = reserva.estado, estado
+            del self._reservas_por_estado[anterior][reserva.id]
+            self._reservas_por_estado.setdefault(estado, {})[reserva.id] = reserva
+            self.estadisticas.cambiar_estado(reserva, anterior)
+        return anterior
+
+    def _notificar(self, reserva: Reserva, anterior: Optional[str]):
+        """Avisa a los suscriptores (fuera de los candados, para que puedan operar sobre el gestor)"""
+        for callback in list(self._suscriptores):
+            try:
+                callback(reserva, anterior)
+            except Exception as e:
+                print(f"Error en suscriptor de reservas: {str(e)}")
+        if self.eventos is not None:
+            self.eventos.publicar("reservas", "alta" if anterior is None else "cambio", reserva, anterior)
 
     def obtener_reservas_usuario(self, usuario_email: str) -> List[Reserva]:
-        return [r for r in self.reservas if r.usuario_email == usuario_email and r.estado == 'activa']
+        return [r for r in self._reservas_por_usuario.get(usuario_email, {}).values() if r.estado in ESTADOS_VIGENTES]
 
     def obtener_historial_reservas(self, usuario_email: str) -> List[Reserva]:
-        return [r for r in self.reservas if r.usuario_email == usuario_email] 
\ No newline at end of file
+        return list(self._reservas_por_usuario.get(usuario_email, {}).values())
+
+def _hay_solapamiento(
+    intervalos_a: Iterator[Tuple[datetime, datetime]],
+    intervalos_b: Iterator[Tuple[datetime, datetime]]
+) -> bool:
+    """Indica si dos secuencias de intervalos ordenadas por inicio se solapan (barrido lineal)"""
+    a = next(intervalos_a, None)
+    b = next(intervalos_b, None)
+    while a and b:
+        if a[1] <= b[0]:
+            a = next(intervalos_a, None)
+        elif b[1] <= a[0]:
+            b = next(intervalos_b, None)
+        else:
+            return True
+    return False
+
+def _huecos(
+    ocupados: Iterator[Tuple[datetime, datetime]],
+    desde: datetime,
+    hasta: datetime
+) -> Iterator[Tuple[datetime, datetime]]:
+    """Intervalos de [desde, hasta) que no cubre ninguno de `ocupados` (ordenados por inicio)"""
+    cursor = desde
+    for inicio, fin in ocupados:
+        if inicio > cursor:
+            yield cursor, min(inicio, hasta)
+        cursor = max(cursor, fin)
+        if cursor >= hasta:
+            return
+    if cursor < hasta:
+        yield cursor, hasta
+
+def _en_horario(
+    intervalos: Iterator[Tuple[datetime, datetime]],
+    horario: Tuple[int, int]
+) -> Iterator[Tuple[datetime, datetime]]:
+    """Recorta cada intervalo a las horas de `horario` de cada día que abarca"""
+    for inicio, fin in intervalos:
+        dia = inicio.replace(hour=0, minute=0, second=0, microsecond=0)
+        while dia < fin:
+            apertura = max(inicio, dia + timedelta(hours=horario[0]))
+            cierre = min(fin, dia + timedelta(hours=horario[1]))
+            if apertura < cierre:
+                yield apertura, cierre
+            dia += timedelta(days=1)
+
+def _revocar_qr(reserva: Reserva, anterior: str):
+    """Avisa a los kioscos cuando una reserva deja de ser válida"""
+    if reserva.estado in ESTADOS_ANULADOS:
+        publish_revocation(reserva.id, SALAS_REVOCATIONS_FILE)
+
+# Gestor compartido por todas las sesiones del proceso
+_gestor_salas = None
+_gestor_salas_lock = threading.Lock()
+
+def obtener_gestor_salas() -> GestorSalas:
+    """Devuelve el gestor de salas único del proceso (lo crea la primera vez)"""
+    global _gestor_salas
+    if _gestor_salas is None:
+        with _gestor_salas_lock:
+            if _gestor_salas is None:
+                _gestor_salas = GestorSalas(gracia_no_show=GRACIA_NO_SHOW, eventos=obtener_bus_eventos())
+                # Los IDs vuelven a empezar: las revocaciones de otra ejecución no aplican
+                clear_revocations(SALAS_REVOCATIONS_FILE)
+                _gestor_salas.suscribir(_revocar_qr)
+                _gestor_salas.planificador.iniciar()
+    return _gestor_salas
\ No newline at end of file
@@ -0,0 +1,666 @@
+import copy
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from modules.locks import FileLock, StripedLock
+
+# Archivos JSON de cada colección
+JSON_FILES = {
+    "rooms": "data/rooms.json",
+    "users": "data/users.json",
+    "reservations": "data/reservations.json",
+}
+
+# Base de datos SQLite
+SQLITE_FILE = "data/salas.db"
+
+# Operaciones del diario antes de compactarlo en una instantánea
+JOURNAL_COMPACT_EVERY = 1000
+
+# Backend por defecto ("json", "journal" o "sqlite")
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "json")
+
+# Campos que se guardan como columnas indexables (el registro completo va en "data")
+INDEXED_FIELDS = {
+    "rooms": ("name",),
+    "users": ("email",),
+    "reservations": ("room_id", "user_id", "start_time", "end_time", "status"),
+}
+
+# Campos de fecha que se normalizan para poder compararlos como texto
+TIME_FIELDS = ("start_time", "end_time")
+
+def _normalize_time(value):
+    """Normaliza una fecha ISO para que el orden de texto coincida con el cronológico"""
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        return value
+
+def _fold(value):
+    """Clave sin distinción de mayúsculas para comparar e indexar valores"""
+    return str(value if value is not None else "").casefold()
+
+def _filter(records, field, value, nocase=False):
+    """Filtra registros cuyo campo coincide con el valor dado"""
+    if nocase:
+        value = _fold(value)
+        return {key: record for key, record in records.items()
+                if _fold(record.get(field)) == value}
+    return {key: record for key, record in records.items() if record.get(field) == value}
+
+def _next_key(keys):
+    """Siguiente ID: uno más que el mayor ID numérico de `keys`"""
+    return max((int(key) for key in keys if key.isdigit()), default=0) + 1
+
+def _build_lookup(records, field):
+    """Índice valor (sin mayúsculas) -> IDs de los registros con ese valor"""
+    lookup = {}
+    for key, record in records.items():
+        lookup.setdefault(_fold(record.get(field)), []).append(key)
+    return lookup
+
+class JSONStorage:
+    """Almacenamiento en un archivo JSON por colección.
+
+    Los archivos leídos se guardan en memoria junto con su `os.stat`
+    (mtime, tamaño, inodo); mientras el archivo no cambie, las lecturas no
+    vuelven a parsearlo. Cada `save` reemplaza el archivo de forma atómica y
+    actualiza la caché. Las búsquedas por campos de `INDEXED_FIELDS` usan un
+    índice en memoria que se reconstruye cuando cambian los registros.
+    """
+
+    def __init__(self, files=None, cache=True):
+        self.files = dict(files or JSON_FILES)
+        self.cache = cache
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._lookups = {}
+        self._stripes = StripedLock()
+        self._file_locks = {collection: FileLock(path + ".lock")
+                            for collection, path in self.files.items()}
+
+    @contextmanager
+    def atomic(self, collection, *keys):
+        """Bloquea una o más claves (p. ej. salones) para verificar y escribir de forma atómica.
+
+        Dentro del proceso se usa un candado por franja; como el archivo JSON se
+        reescribe completo, además se toma el bloqueo de archivo de la colección
+        para excluir a otros procesos.
+        """
+        with self._stripes.hold((collection, key) for key in keys), self._file_locks[collection]:
+            yield
+
+    def _stat_key(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino, st.st_ctime_ns)
+
+    def _read(self, collection):
+        """Lee una colección directamente del archivo JSON"""
+        path = self.files[collection]
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except:
+            return {}
+
+    def _records(self, collection):
+        """Registros de una colección (compartidos con la caché: no modificar)"""
+        if not self.cache:
+            return self._read(collection)
+        key = self._stat_key(self.files[collection])
+        cached = self._cache.get(collection)
+        if cached is not None and key is not None and cached[0] == key:
+            return cached[1]
+        records = self._read(collection)
+        with self._cache_lock:
+            self._cache[collection] = (key, records)
+        return records
+
+    def invalidate(self, collection=None):
+        """Descarta la caché de una colección (o de todas)"""
+        with self._cache_lock:
+            if collection is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(collection, None)
+
+    def load(self, collection):
+        """Carga todos los registros de una colección (una copia propia, que se puede modificar).
+
+        Se parsea el archivo directamente: cuesta lo mismo que parsear una copia
+        guardada en memoria y bastante menos que copiar la caché con deepcopy.
+        """
+        return self._read(collection)
+
+    def save(self, collection, records):
+        """Reemplaza todos los registros de una colección"""
+        path = self.files[collection]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        content = json.dumps(records, indent=4)
+        temp_path = path + ".tmp"
+        with self._file_locks[collection]:
+            try:
+                with open(temp_path, "w") as f:
+                    f.write(content)
+                os.replace(temp_path, path)
+            except:
+                self.invalidate(collection)
+                raise
+            if self.cache:
+                with self._cache_lock:
+                    self._cache[collection] = (self._stat_key(path), json.loads(content))
+
+    def get(self, collection, key):
+        """Obtiene un registro por su ID"""
+        return copy.deepcopy(self._records(collection).get(key))
+
+    def count(self, collection):
+        """Cuenta los registros de una colección"""
+        return len(self._records(collection))
+
+    def _lookup(self, collection, field):
+        """Índice de un campo para los registros actuales (se reconstruye si cambiaron)"""
+        records = self._records(collection)
+        cached = self._lookups.get((collection, field))
+        if cached is not None and cached[0] is records:
+            return records, cached[1]
+        lookup = _build_lookup(records, field)
+        self._lookups[(collection, field)] = (records, lookup)
+        return records, lookup
+
+    def _drop_lookups(self, collection):
+        """Descarta los índices de una colección modificada en el lugar"""
+        for field in INDEXED_FIELDS.get(collection, ()):
+            self._lookups.pop((collection, field), None)
+
+    def find(self, collection, field, value, nocase=False):
+        """Obtiene los registros cuyo campo coincide con el valor dado"""
+        if field not in INDEXED_FIELDS.get(collection, ()):
+            return copy.deepcopy(_filter(self._records(collection), field, value, nocase))
+        records, lookup = self._lookup(collection, field)
+        candidates = {key: records[key] for key in lookup.get(_fold(value), ())}
+        return copy.deepcopy(_filter(candidates, field, value, nocase))
+
+    def find_overlapping(self, room_id, start_time, end_time):
+        """Obtiene las reservas de un salón que se superponen con el horario dado"""
+        new_start = datetime.fromisoformat(start_time)
+        new_end = datetime.fromisoformat(end_time)
+        overlapping = {}
+        for key, reservation in self._records("reservations").items():
+            if reservation["room_id"] == room_id:
+                existing_start = datetime.fromisoformat(reservation["start_time"])
+                existing_end = datetime.fromisoformat(reservation["end_time"])
+                if new_start < existing_end and new_end > existing_start:
+                    overlapping[key] = reservation
+        return copy.deepcopy(overlapping)
+
+    def insert(self, collection, record):
+        """Crea un registro con el siguiente ID y lo devuelve"""
+        return self.insert_many(collection, [record])[0]
+
+    def insert_many(self, collection, records):
+        """Crea varios registros con IDs consecutivos en una sola escritura.
+
+        El próximo ID se guarda aparte (ver sequence_path) y solo avanza: un ID
+        borrado no se vuelve a usar. Se guarda antes que los registros, así que
+        una caída entre ambas escrituras pierde IDs pero nunca los repite.
+        """
+        with self._file_locks[collection]:
+            existing = dict(self._records(collection))
+            first = max(self._read_sequence(collection), _next_key(existing))
+            keys = [str(first + i) for i in range(len(records))]
+            self._write_sequence(collection, first + len(records))
+            existing.update(zip(keys, records))
+            self.save(collection, existing)
+        return keys
+
+    def sequence_path(self, collection):
+        """Ruta del archivo con el próximo ID de una colección"""
+        return os.path.splitext(self.files[collection])[0] + ".seq"
+
+    def _read_sequence(self, collection):
+        try:
+            with open(self.sequence_path(collection)) as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_sequence(self, collection, next_key):
+        path = self.sequence_path(collection)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(str(next_key))
+        os.replace(temp_path, path)
+
+    def put(self, collection, key, record):
+        """Crea o reemplaza un registro"""
+        self.put_many(collection, {key: record})
+
+    def put_many(self, collection, records):
+        """Crea o reemplaza varios registros en una sola escritura"""
+        with self._file_locks[collection]:
+            existing = dict(self._records(collection))
+            existing.update(records)
+            self.save(collection, existing)
+
+    def delete(self, collection, key):
+        """Elimina un registro; devuelve False si no existía"""
+        with self._file_locks[collection]:
+            records = dict(self._records(collection))
+            if key not in records:
+                return False
+            del records[key]
+            self.save(collection, records)
+        return True
+
+class JournalStorage(JSONStorage):
+    """Almacenamiento JSON con diario de solo anexado.
+
+    Cada modificación agrega una línea JSON al diario de la colección (costo
+    O(1) por operación). Cada `compact_every` operaciones se escribe una
+    instantánea completa en el archivo JSON y se vacía el diario. Al iniciar se
+    carga la instantánea y se reaplica el diario; una última línea incompleta
+    (escritura cortada por una caída) se descarta. Supone un único proceso
+    escritor, por lo que no usa bloqueos de archivo.
+    """
+
+    def __init__(self, files=None, compact_every=JOURNAL_COMPACT_EVERY, fsync=True):
+        super().__init__(files, cache=False)
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._data = {}
+        self._pending = {}
+        # Próximo ID por colección: se recupera al cargarla (archivo de
+        # secuencia, instantánea y diario) y después solo avanza
+        self._next_keys = {}
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def atomic(self, collection, *keys):
+        """Bloquea una o más claves (p. ej. salones) para verificar y escribir de forma atómica"""
+        with self._stripes.hold((collection, key) for key in keys):
+            yield
+
+    def journal_path(self, collection):
+        """Ruta del diario de una colección"""
+        return os.path.splitext(self.files[collection])[0] + ".log"
+
+    def _records(self, collection):
+        with self._lock:
+            if collection not in self._data:
+                self._data[collection] = self._read(collection)
+                self._next_keys[collection] = max(self._read_sequence(collection),
+                                                  _next_key(self._data[collection]))
+                self._pending[collection] = self._replay(collection, self._data[collection])
+            return self._data[collection]
+
+    def _replay(self, collection, records):
+        """Reaplica el diario sobre la instantánea y devuelve las operaciones leídas"""
+        path = self.journal_path(collection)
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb") as f:
+            content = f.read()
+        # Todo lo que sigue al último salto de línea es una escritura incompleta
+        valid_size = content.rfind(b"\n") + 1
+        if valid_size < len(content):
+            print(f"Diario {path}: se descarta una última línea incompleta")
+            with open(path, "r+b") as f:
+                f.truncate(valid_size)
+        operations = 0
+        put_keys = []
+        for line in content[:valid_size].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                print(f"Diario {path}: se ignora una línea corrupta")
+                continue
+            if entry["op"] == "put":
+                records[entry["key"]] = entry["record"]
+                # Un ID del diario cuenta aunque luego se haya borrado
+                put_keys.append(entry["key"])
+            elif entry["op"] == "delete":
+                records.pop(entry["key"], None)
+            operations += 1
+        self._next_keys[collection] = max(self._next_keys[collection], _next_key(put_keys))
+        return operations
+
+    def _append(self, collection, *entries):
+        path = self.journal_path(collection)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._drop_lookups(collection)
+        self._pending[collection] += len(entries)
+        if self._pending[collection] >= self.compact_every:
+            self.compact(collection)
+
+    def compact(self, collection):
+        """Escribe una instantánea de la colección y vacía su diario"""
+        with self._lock:
+            records = self._records(collection)
+            # Los IDs borrados dejan de estar en el diario: el próximo se guarda antes de vaciarlo
+            self._write_sequence(collection, self._next_keys[collection])
+            path = self.files[collection]
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(records, f, indent=4)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(temp_path, path)
+            # Si hay una caída antes de vaciar el diario, reaplicarlo es inofensivo
+            open(self.journal_path(collection), "w").close()
+            self._pending[collection] = 0
+
+    def load(self, collection):
+        """Carga todos los registros de una colección"""
+        with self._lock:
+            # Los registros son JSON: copiarlos así es más rápido que con deepcopy
+            return json.loads(json.dumps(self._records(collection)))
+
+    def save(self, collection, records):
+        """Reemplaza todos los registros de una colección"""
+        with self._lock:
+            self._records(collection)
+            self._data[collection] = copy.deepcopy(records)
+            self._next_keys[collection] = max(self._next_keys[collection], _next_key(records))
+            self.compact(collection)
+
+    def find(self, collection, field, value, nocase=False):
+        """Obtiene los registros cuyo campo coincide con el valor dado"""
+        with self._lock:
+            return super().find(collection, field, value, nocase)
+
+    def find_overlapping(self, room_id, start_time, end_time):
+        """Obtiene las reservas de un salón que se superponen con el horario dado"""
+        with self._lock:
+            return super().find_overlapping(room_id, start_time, end_time)
+
+    def insert(self, collection, record):
+        """Crea un registro con el siguiente ID y lo devuelve"""
+        return self.insert_many(collection, [record])[0]
+
+    def insert_many(self, collection, records):
+        """Crea varios registros con IDs consecutivos en una sola escritura"""
+        with self._lock:
+            existing = self._records(collection)
+            first = self._next_keys[collection]
+            self._next_keys[collection] = first + len(records)
+            keys = [str(first + i) for i in range(len(records))]
+            for key, record in zip(keys, records):
+                existing[key] = copy.deepcopy(record)
+            self._append(collection, *({"op": "put", "key": key, "record": record}
+                                       for key, record in zip(keys, records)))
+        return keys
+
+    def put(self, collection, key, record):
+        """Crea o reemplaza un registro"""
+        self.put_many(collection, {key: record})
+
+    def put_many(self, collection, records):
+        """Crea o reemplaza varios registros con una sola escritura en el diario"""
+        with self._lock:
+            existing = self._records(collection)
+            self._next_keys[collection] = max(self._next_keys[collection], _next_key(records))
+            for key, record in records.items():
+                existing[key] = copy.deepcopy(record)
+            self._append(collection, *({"op": "put", "key": key, "record": record}
+                                       for key, record in records.items()))
+
+    def delete(self, collection, key):
+        """Elimina un registro; devuelve False si no existía"""
+        with self._lock:
+            records = self._records(collection)
+            if key not in records:
+                return False
+            del records[key]
+            self._append(collection, {"op": "delete", "key": key})
+            return True
+
+class SQLiteStorage:
+    """Almacenamiento en SQLite (modo WAL) con índices por salón, usuario, email y horario"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rooms (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            email TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_users_email ON users (email COLLATE NOCASE);
+        CREATE TABLE IF NOT EXISTS reservations (
+            id TEXT PRIMARY KEY,
+            room_id TEXT,
+            user_id TEXT,
+            start_time TEXT,
+            end_time TEXT,
+            status TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_reservations_room ON reservations (room_id);
+        CREATE INDEX IF NOT EXISTS idx_reservations_user ON reservations (user_id);
+        CREATE INDEX IF NOT EXISTS idx_reservations_slot
+            ON reservations (room_id, start_time, end_time);
+        CREATE TABLE IF NOT EXISTS sequences (
+            collection TEXT PRIMARY KEY,
+            next_id INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path=SQLITE_FILE):
+        self.path = path
+        # Una conexión por hilo: Flet atiende los eventos en hilos distintos
+        self._local = threading.local()
+        self._stripes = StripedLock()
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Las transacciones se abren explícitamente en _transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Transacción de escritura (BEGIN IMMEDIATE); las anidadas se unen a la externa"""
+        conn = self._connect()
+        if self._local.depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield conn
+        except:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                conn.execute("ROLLBACK")
+            raise
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            conn.execute("COMMIT")
+
+    @contextmanager
+    def atomic(self, collection, *keys):
+        """Bloquea una o más claves (p. ej. salones) para verificar y escribir de forma atómica.
+
+        El candado por franja ordena a los hilos del proceso antes de pedir el
+        bloqueo de escritura de SQLite, que excluye a otros procesos.
+        """
+        with self._stripes.hold((collection, key) for key in keys), self._transaction():
+            yield
+
+    def _row(self, collection, key, record):
+        values = [key]
+        for field in INDEXED_FIELDS[collection]:
+            value = record.get(field)
+            values.append(_normalize_time(value) if field in TIME_FIELDS else value)
+        values.append(json.dumps(record))
+        return values
+
+    def _insert_sql(self, collection, replace=True):
+        columns = ("id",) + INDEXED_FIELDS[collection] + ("data",)
+        placeholders = ", ".join("?" for _ in columns)
+        verb = "INSERT OR REPLACE" if replace else "INSERT"
+        return f"{verb} INTO {collection} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    def load(self, collection):
+        """Carga todos los registros de una colección"""
+        rows = self._connect().execute(f"SELECT id, data FROM {collection} ORDER BY rowid")
+        return {key: json.loads(data) for key, data in rows}
+
+    def save(self, collection, records):
+        """Reemplaza todos los registros de una colección"""
+        with self._transaction() as conn:
+            conn.execute(f"DELETE FROM {collection}")
+            conn.executemany(
+                self._insert_sql(collection),
+                (self._row(collection, key, record) for key, record in records.items())
+            )
+            # El próximo ID se conserva: reemplazar la colección no libera los IDs usados
+            conn.execute("UPDATE sequences SET next_id = MAX(next_id, ?) WHERE collection = ?",
+                         (_next_key(records), collection))
+
+    def get(self, collection, key):
+        """Obtiene un registro por su ID"""
+        row = self._connect().execute(
+            f"SELECT data FROM {collection} WHERE id = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, collection):
+        """Cuenta los registros de una colección"""
+        return self._connect().execute(f"SELECT COUNT(*) FROM {collection}").fetchone()[0]
+
+    def find(self, collection, field, value, nocase=False):
+        """Obtiene los registros cuyo campo coincide con el valor dado"""
+        if field not in INDEXED_FIELDS[collection]:
+            return _filter(self.load(collection), field, value, nocase)
+        collate = " COLLATE NOCASE" if nocase else ""
+        rows = self._connect().execute(
+            f"SELECT id, data FROM {collection} WHERE {field} = ?{collate} ORDER BY rowid",
+            (value,)
+        )
+        return {key: json.loads(data) for key, data in rows}
+
+    def find_overlapping(self, room_id, start_time, end_time):
+        """Obtiene las reservas de un salón que se superponen con el horario dado"""
+        rows = self._connect().execute(
+            "SELECT id, data FROM reservations "
+            "WHERE room_id = ? AND start_time < ? AND end_time > ? ORDER BY rowid",
+            (room_id, _normalize_time(end_time), _normalize_time(start_time))
+        )
+        return {key: json.loads(data) for key, data in rows}
+
+    def insert(self, collection, record):
+        """Crea un registro con el siguiente ID y lo devuelve"""
+        return self.insert_many(collection, [record])[0]
+
+    def insert_many(self, collection, records):
+        """Crea varios registros con IDs consecutivos en una sola transacción.
+
+        El próximo ID se guarda en la tabla sequences (la primera vez se calcula
+        como uno más que el mayor existente); un choque con un ID existente
+        lanza sqlite3.IntegrityError en lugar de reemplazar el registro.
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT next_id FROM sequences WHERE collection = ?", (collection,)).fetchone()
+            if row:
+                first = row[0]
+            else:
+                first = (conn.execute(
+                    f"SELECT MAX(CAST(id AS INTEGER)) FROM {collection} WHERE id GLOB '[0-9]*'"
+                ).fetchone()[0] or 0) + 1
+            keys = [str(first + i) for i in range(len(records))]
+            conn.executemany(
+                self._insert_sql(collection, replace=False),
+                (self._row(collection, key, record) for key, record in zip(keys, records))
+            )
+            conn.execute("INSERT OR REPLACE INTO sequences (collection, next_id) VALUES (?, ?)",
+                         (collection, first + len(records)))
+        return keys
+
+    def put(self, collection, key, record):
+        """Crea o reemplaza un registro"""
+        self.put_many(collection, {key: record})
+
+    def put_many(self, collection, records):
+        """Crea o reemplaza varios registros en una sola transacción"""
+        with self._transaction() as conn:
+            conn.executemany(
+                self._insert_sql(collection),
+                (self._row(collection, key, record) for key, record in records.items())
+            )
+            # Un ID explícito más allá del próximo lo adelanta
+            conn.execute("UPDATE sequences SET next_id = MAX(next_id, ?) WHERE collection = ?",
+                         (_next_key(records), collection))
+
+    def delete(self, collection, key):
+        """Elimina un registro; devuelve False si no existía"""
+        with self._transaction() as conn:
+            cursor = conn.execute(f"DELETE FROM {collection} WHERE id = ?", (key,))
+        return cursor.rowcount > 0
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def create_storage(backend=None):
+    """Crea un backend de almacenamiento por nombre"""
+    backend = backend or STORAGE_BACKEND
+    if backend == "json":
+        return JSONStorage()
+    if backend == "journal":
+        return JournalStorage()
+    if backend == "sqlite":
+        return SQLiteStorage()
+    raise ValueError(f"Backend de almacenamiento desconocido: {backend}")
+
+def get_storage():
+    """Obtiene el backend de almacenamiento configurado"""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+    return _storage
+
+def set_storage(storage):
+    """Cambia el backend de almacenamiento usado por los módulos"""
+    global _storage
+    with _storage_lock:
+        _storage = storage
+
+def migrate_json_to_sqlite(json_files=None, db_path=SQLITE_FILE):
+    """Copia los datos de los archivos JSON a la base SQLite"""
+    source = JSONStorage(json_files)
+    target = SQLiteStorage(db_path)
+    migrated = {}
+    for collection in INDEXED_FIELDS:
+        records = source.load(collection)
+        target.save(collection, records)
+        migrated[collection] = len(records)
+    return migrated
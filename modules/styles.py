@@ -1,3 +1,5 @@
+import threading
+from itertools import islice
 import flet as ft
 from flet import colors, padding, border_radius, ButtonStyle, TextStyle
 
@@ -205,4 +207,46 @@ def divider_with_text(text: str):
         content=ft.Text(text, **TYPOGRAPHY["caption"]),
         margin=padding.symmetric(vertical=SPACING["md"]),
         alignment=ft.alignment.center
-    ) 
\ No newline at end of file
+    ) 
+
+# Listas largas
+PAGE_SIZE = 50
+
+def paged_list_view(controls, page_size=PAGE_SIZE, load_threshold=300):
+    """ListView que consume `controls` (iterable perezoso) de a una página.
+
+    La siguiente página se agrega al acercarse al final del desplazamiento o
+    con el botón "Cargar más", así que solo existen los controles ya mostrados.
+    """
+    pending = iter(controls)
+    lookahead = []
+    loading = threading.Lock()
+    list_view = ft.ListView(expand=True, spacing=SPACING["sm"], on_scroll_interval=100)
+    more_button = secondary_button("Cargar más", icon=ft.icons.EXPAND_MORE,
+                                   on_click=lambda e: load_page())
+
+    def load_page(update=True):
+        nonlocal lookahead
+        # Evitar cargar la misma página dos veces con eventos simultáneos
+        if not loading.acquire(blocking=False):
+            return
+        try:
+            batch = lookahead + list(islice(pending, page_size + 1 - len(lookahead)))
+            batch, lookahead = batch[:page_size], batch[page_size:]
+            if list_view.controls and list_view.controls[-1] is more_button:
+                list_view.controls.pop()
+            list_view.controls.extend(batch)
+            if lookahead:
+                list_view.controls.append(more_button)
+            if update:
+                list_view.update()
+        finally:
+            loading.release()
+
+    def on_scroll(e):
+        if lookahead and e.pixels >= e.max_scroll_extent - load_threshold:
+            load_page()
+
+    list_view.on_scroll = on_scroll
+    load_page(update=False)
+    return list_view
\ No newline at end of file
@@ -0,0 +1,111 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+# Hilos para los trabajos de almacenamiento y QR lanzados desde la interfaz
+MAX_HILOS_TAREAS = 4
+
+class MetricasBloqueo:
+    """Tiempo que cada manejador de eventos mantiene ocupado su hilo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiempos = {}
+
+    def registrar(self, nombre: str, segundos: float):
+        with self._lock:
+            cantidad, total, maximo = self._tiempos.get(nombre, (0, 0.0, 0.0))
+            self._tiempos[nombre] = (cantidad + 1, total + segundos, max(maximo, segundos))
+
+    def medir(self, nombre: str):
+        """Decorador que registra cuánto tarda en volver un manejador"""
+        def decorador(manejador):
+            @wraps(manejador)
+            def envoltura(*args, **kwargs):
+                inicio = time.perf_counter()
+                try:
+                    return manejador(*args, **kwargs)
+                finally:
+                    self.registrar(nombre, time.perf_counter() - inicio)
+            return envoltura
+        return decorador
+
+    def resumen(self) -> dict:
+        """Por manejador: cantidad de llamadas, promedio y máximo en milisegundos"""
+        with self._lock:
+            return {nombre: {"llamadas": cantidad,
+                             "promedio_ms": total / cantidad * 1000,
+                             "maximo_ms": maximo * 1000}
+                    for nombre, (cantidad, total, maximo) in self._tiempos.items()}
+
+class Navegacion:
+    """Contador de vistas de una sesión para descartar resultados obsoletos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+
+    @property
+    def actual(self) -> int:
+        return self._version
+
+    def avanzar(self) -> int:
+        """Marca el cambio a una vista nueva"""
+        with self._lock:
+            self._version += 1
+            return self._version
+
+    def vigente(self, version: int) -> bool:
+        return version == self._version
+
+class EjecutorTareas:
+    """Ejecuta trabajos bloqueantes en un grupo acotado de hilos.
+
+    Los manejadores de Flet solo encolan el trabajo y vuelven enseguida; el
+    resultado se entrega a `al_terminar` (o la excepción a `al_fallar`) desde
+    el hilo de trabajo, salvo que la sesión haya cambiado de vista entretanto.
+    `al_finalizar` se llama siempre al final, p. ej. para ocultar un indicador.
+    """
+
+    def __init__(self, max_hilos=MAX_HILOS_TAREAS):
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="tareas")
+        self.metricas = MetricasBloqueo()
+
+    def ejecutar(self, trabajo, al_terminar, al_fallar=None, al_finalizar=None,
+                 navegacion: Navegacion = None):
+        version = navegacion.actual if navegacion else None
+
+        def correr():
+            try:
+                try:
+                    resultado = trabajo()
+                except Exception as e:
+                    if al_fallar and (navegacion is None or navegacion.vigente(version)):
+                        al_fallar(e)
+                    else:
+                        print(f"Error en tarea en segundo plano: {str(e)}")
+                    return
+                if navegacion is None or navegacion.vigente(version):
+                    al_terminar(resultado)
+            finally:
+                if al_finalizar:
+                    al_finalizar()
+
+        return self._pool.submit(correr)
+
+    def cerrar(self):
+        self._pool.shutdown(wait=True)
+
+# Ejecutor compartido por todas las sesiones del proceso
+_ejecutor = None
+_ejecutor_lock = threading.Lock()
+
+def obtener_ejecutor_tareas() -> EjecutorTareas:
+    """Devuelve el ejecutor de tareas único del proceso (lo crea la primera vez)"""
+    global _ejecutor
+    if _ejecutor is None:
+        with _ejecutor_lock:
+            if _ejecutor is None:
+                _ejecutor = EjecutorTareas()
+    return _ejecutor
\ No newline at end of file
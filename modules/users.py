@@ -1,27 +1,29 @@
 from flet import *
-import json
-import os
 from datetime import datetime
+import atexit
 import hashlib
+import threading
+from modules.storage import JSON_FILES, get_storage
+from modules.eventos import obtener_bus_eventos
 
-# Ruta del archivo de usuarios
-USERS_FILE = "data/users.json"
+# Ruta del archivo de usuarios (backend JSON)
+USERS_FILE = JSON_FILES["users"]
+
+# Segundos que se acumulan los últimos inicios de sesión antes de escribirlos
+LAST_LOGIN_FLUSH_INTERVAL = 5
+
+# Último inicio de sesión por usuario, pendiente de escribir
+_pending_logins = {}
+_pending_lock = threading.Lock()
+_flush_timer = None
 
 def load_users():
-    """Carga los usuarios desde el archivo JSON"""
-    if not os.path.exists(USERS_FILE):
-        return {}
-    try:
-        with open(USERS_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return {}
+    """Carga los usuarios desde el almacenamiento"""
+    return get_storage().load("users")
 
 def save_users(users):
-    """Guarda los usuarios en el archivo JSON"""
-    os.makedirs(os.path.dirname(USERS_FILE), exist_ok=True)
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=4)
+    """Guarda los usuarios en el almacenamiento"""
+    get_storage().save("users", users)
 
 def hash_password(password):
     """Hashea una contraseña usando SHA-256"""
@@ -29,65 +31,103 @@ def hash_password(password):
 
 def create_user(email, password, name, role="teacher"):
     """Crea un nuevo usuario"""
-    users = load_users()
+    storage = get_storage()
     
-    # Verificar si el email ya existe
-    for user in users.values():
-        if user["email"].lower() == email.lower():
+    with storage.atomic("users", email.lower()):
+        # Verificar si el email ya existe
+        if storage.find("users", "email", email, nocase=True):
             return False, "Ya existe un usuario con ese email"
-    
-    # Crear nuevo usuario
-    user_id = str(len(users) + 1)
-    users[user_id] = {
-        "email": email,
-        "password": hash_password(password),
-        "name": name,
-        "role": role,
-        "created_at": datetime.now().isoformat(),
-        "last_login": None
-    }
-    
-    save_users(users)
+        
+        # Crear nuevo usuario
+        user_id = storage.insert("users", {
+            "email": email,
+            "password": hash_password(password),
+            "name": name,
+            "role": role,
+            "created_at": datetime.now().isoformat(),
+            "last_login": None
+        })
+    obtener_bus_eventos().publicar("usuarios", "alta", user_id)
     return True, "Usuario creado exitosamente"
 
 def authenticate_user(email, password):
     """Autentica un usuario"""
-    users = load_users()
-    for user_id, user in users.items():
-        if user["email"].lower() == email.lower() and user["password"] == hash_password(password):
-            # Actualizar último login
-            user["last_login"] = datetime.now().isoformat()
-            save_users(users)
+    password_hash = hash_password(password)
+    for user_id, user in get_storage().find("users", "email", email, nocase=True).items():
+        if user["password"] == password_hash:
+            # El último login se escribe en lote más tarde
+            user["last_login"] = _record_login(user_id)
             return True, user_id, user
     return False, None, None
 
+def _record_login(user_id):
+    """Anota el último inicio de sesión y programa su escritura"""
+    global _flush_timer
+    now = datetime.now().isoformat()
+    with _pending_lock:
+        _pending_logins[user_id] = now
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(LAST_LOGIN_FLUSH_INTERVAL, flush_last_logins)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+    return now
+
+def flush_last_logins():
+    """Escribe en una sola operación los últimos inicios de sesión pendientes"""
+    global _flush_timer
+    with _pending_lock:
+        pending = dict(_pending_logins)
+        _flush_timer = None
+    if not pending:
+        return 0
+    storage = get_storage()
+    with storage.atomic("users", *pending):
+        updated = {}
+        for user_id, last_login in pending.items():
+            user = storage.get("users", user_id)
+            if user is not None:
+                user["last_login"] = last_login
+                updated[user_id] = user
+        if updated:
+            storage.put_many("users", updated)
+    with _pending_lock:
+        # Quitar solo los que no cambiaron mientras se escribía
+        for user_id, last_login in pending.items():
+            if _pending_logins.get(user_id) == last_login:
+                del _pending_logins[user_id]
+    return len(updated)
+
+atexit.register(flush_last_logins)
+
 def get_user(user_id):
     """Obtiene un usuario por su ID"""
-    users = load_users()
-    return users.get(user_id)
+    user = get_storage().get("users", user_id)
+    if user is not None and user_id in _pending_logins:
+        user["last_login"] = _pending_logins[user_id]
+    return user
 
 def update_user(user_id, **kwargs):
     """Actualiza los detalles de un usuario"""
-    users = load_users()
-    if user_id not in users:
-        return False, "Usuario no encontrado"
-    
-    for key, value in kwargs.items():
-        if key in users[user_id]:
-            if key == "password":
-                users[user_id][key] = hash_password(value)
-            else:
-                users[user_id][key] = value
-    
-    save_users(users)
+    storage = get_storage()
+    with storage.atomic("users", user_id):
+        user = storage.get("users", user_id)
+        if user is None:
+            return False, "Usuario no encontrado"
+        
+        for key, value in kwargs.items():
+            if key in user:
+                if key == "password":
+                    user[key] = hash_password(value)
+                else:
+                    user[key] = value
+        
+        storage.put("users", user_id, user)
+    obtener_bus_eventos().publicar("usuarios", "cambio", user_id)
     return True, "Usuario actualizado exitosamente"
 
 def delete_user(user_id):
     """Elimina un usuario"""
-    users = load_users()
-    if user_id not in users:
+    if not get_storage().delete("users", user_id):
         return False, "Usuario no encontrado"
-    
-    del users[user_id]
-    save_users(users)
+    obtener_bus_eventos().publicar("usuarios", "baja", user_id)
     return True, "Usuario eliminado exitosamente" 
\ No newline at end of file